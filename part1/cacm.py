@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Reading a collection in the CACM format.
+
+A collection is a list of records. Every record starts with a ".I <id>" line
+and is made of fields. Each field starts with a tag line (".T" title, ".W"
+abstract, ".A" authors, ...) and holds the text lines that follow it up to the
+next tag line.
+
+    .I 1
+    .T
+    Preliminary Report-International Algebraic Language
+    .B
+    CACM December, 1958
+    ...
+
+offsets() finds the byte offset and length of every record, so a record is
+read again with one seek (record()) instead of a scan from the top.
+"""
+import re
+from StringIO import StringIO
+
+#every tag used in cacm.all
+TAGS = [".I", ".T", ".W", ".B", ".A", ".N", ".X", ".K", ".C"]
+
+idline = re.compile(r"^\.I[ \t]+(\S+)", re.M) #".I <id>" line, the start of a record
+
+def tag(line):
+    """Return the tag of a tag line, or None if line is a text line."""
+    if line.startswith("."):
+        fields = line.split()
+        if fields[0] in TAGS:
+            return fields[0]
+    return None
+
+def seek(infile, offset):
+    """Move infile to the start of the first line at or after byte offset."""
+    if offset <= 0:
+        infile.seek(0)
+    else:
+        infile.seek(offset-1)
+        infile.readline() #rest of the line byte offset-1 is in
+
+def records(infile, end=None):
+    """Yield (id, fields) for every record in infile, reading it once, one
+    line at a time from the current position. id is the document ID string
+    from the ".I" line and fields maps every tag of the record to the list of
+    its text lines, for example fields[".T"] is the title.
+
+    If end is given only the records whose ".I" line starts before byte offset
+    end are read, so a collection can be split into byte ranges that each hold
+    whole records.
+    """
+    id = None
+    fields = {}
+    lines = None
+    offset = 0
+    while 1:
+        if end is not None:
+            offset = infile.tell()
+        line = infile.readline()
+        if line == '': #End of File
+            break
+        t = tag(line)
+        if t == ".I": #found id, the record before it is complete
+            if (end is not None) and (offset >= end): #next record is in the next range
+                break
+            if id is not None:
+                yield id, fields
+            id = line.split()[1]
+            fields = {}
+            lines = None
+        elif t is not None: #found a field tag
+            lines = fields.setdefault(t, [])
+        elif lines is not None: #text line of the current field
+            lines.append(line)
+    if id is not None:
+        yield id, fields
+
+def offsets(text):
+    """Return document ID -> (offset, length) of every record in text, the
+    whole collection read in binary mode, in bytes from the start of text."""
+    found = [(m.group(1), m.start()) for m in idline.finditer(text)]
+    records = {}
+    for index in range(len(found)):
+        end = len(text)
+        if index+1 < len(found):
+            end = found[index+1][1]
+        records[found[index][0]] = (found[index][1], end - found[index][1])
+    return records
+
+def record(infile, offset, length):
+    """Return (id, fields) of the record of length bytes at offset in infile,
+    like records()."""
+    infile.seek(offset)
+    for id, fields in records(StringIO(infile.read(length))):
+        return id, fields
+    return None, {}
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Compressed posting lists.
+
+A posting list [ [doc#], [term freq], [ [pos doc1], [pos doc2], ... ] ] is
+stored as one string of variable byte encoded numbers:
+
+    doc freq
+    doc number gap, term freq     for every doc (first gap is the doc number)
+    term position gaps            for every doc, term freq of them
+
+Docs are numbered 0, 1, 2, ... in collection order (indexfile.py keeps the
+table back to the document IDs of the collection). Doc numbers and positions
+are increasing so they are stored as the gap to the one before, which keeps
+the numbers small. Variable byte encoding writes a number
+7 bits per byte, the high bit marks the last byte of the number, so small
+numbers take one byte. Doc numbers and term frequencies come before all the
+positions, so they can be decoded without touching the positions.
+"""
+
+from array import array
+
+def vbyte(n):
+    """Return the variable byte encoding of the number n >= 0."""
+    bytes = [chr(128 + n % 128)] #last byte has the high bit set
+    n = n // 128
+    while n > 0:
+        bytes.append(chr(n % 128))
+        n = n // 128
+    bytes.reverse()
+    return "".join(bytes)
+
+def encode(post):
+    """Return the compressed string of the posting list post, doc# are doc
+    numbers."""
+    out = [vbyte(len(post[0]))] #doc freq
+    last = 0
+    for i in range(len(post[0])):
+        out.append(vbyte(post[0][i] - last)) #doc number gap
+        out.append(vbyte(post[1][i])) #term freq
+        last = post[0][i]
+    for i in range(len(post[2])):
+        last = 0
+        for pos in post[2][i]:
+            out.append(vbyte(pos - last)) #term position gap
+            last = pos
+    return "".join(out)
+
+def decode(data, positions=True):
+    """Return the posting list [ [doc#], [term freq], [ [pos doc1], ... ] ] of
+    the compressed string data. Doc numbers and term freqs are array("i"),
+    4 bytes each. If positions is False only [ [doc#], [term freq] ] is
+    decoded."""
+    numbers = array("i")
+    n = 0
+    b = bytearray(data)
+    i = 0
+    #doc freq
+    while b[i] < 128:
+        n = n*128 + b[i]
+        i = i+1
+    df = n*128 + b[i] - 128
+    i = i+1
+    #doc number gaps and term freqs
+    count = df*2
+    n = 0
+    while count > 0:
+        if b[i] < 128:
+            n = n*128 + b[i]
+        else:
+            numbers.append(n*128 + b[i] - 128)
+            n = 0
+            count = count-1
+        i = i+1
+    docs = array("i")
+    doc = 0
+    for gap in numbers[0::2]:
+        doc = doc + gap
+        docs.append(doc)
+    tfs = numbers[1::2]
+    if not positions:
+        return [docs, tfs]
+    #term position gaps
+    pos = []
+    for tf in tfs:
+        p = []
+        last = 0
+        while tf > 0:
+            if b[i] < 128:
+                n = n*128 + b[i]
+            else:
+                last = last + n*128 + b[i] - 128
+                p.append(last)
+                n = 0
+                tf = tf-1
+            i = i+1
+        pos.append(p)
+    return [docs, tfs, pos]
+
+def encodedocs(docs):
+    """Return the compressed string of the increasing list of doc numbers
+    docs: how many there are, then the doc number gaps."""
+    out = [vbyte(len(docs))]
+    last = 0
+    for doc in docs:
+        out.append(vbyte(doc - last))
+        last = doc
+    return "".join(out)
+
+def decodedocs(data):
+    """Return the array("i") of doc numbers of the compressed string data."""
+    docs = array("i")
+    b = bytearray(data)
+    n = 0
+    i = 0
+    count = -1 #the first number is how many docs there are
+    doc = 0
+    while count != 0:
+        if b[i] < 128:
+            n = n*128 + b[i]
+        elif count == -1:
+            count = n*128 + b[i] - 128
+            n = 0
+        else:
+            doc = doc + n*128 + b[i] - 128
+            docs.append(doc)
+            n = 0
+            count = count-1
+        i = i+1
+    return docs
+
+class Postings(dict):
+    """The list of compressed posting lists of the postings section of
+    index.bin (indexfile.Encoded), indexed like the list of decoded posting
+    lists. A posting list is decoded the first time it
+    is used and kept, so terms that are never looked up are never decoded and
+    looking up a decoded one is a plain dict lookup."""
+
+    def __init__(self, data, positions=True):
+        dict.__init__(self)
+        self.data = data #compressed posting lists
+        self.positions = positions #decode term positions too
+
+    def __len__(self):
+        return len(self.data)
+
+    def __missing__(self, link):
+        post = decode(self.data[link], self.positions)
+        self[link] = post
+        return post
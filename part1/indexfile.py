@@ -0,0 +1,760 @@
+#!/usr/bin/env python
+"""Binary index file.
+
+index.bin holds the dictionary and the compressed posting lists in a layout
+that is memory mapped instead of loaded: a process only reads the pages of the
+terms it looks up, and processes using the same index share one copy of it in
+the page cache.
+
+    header     "IRINDEX1", number of sections
+    sections   name, byte offset and byte length of every section
+    terms      (number of terms + 1) unsigned ints, offset of every term in termtext
+    termtext   the terms one after the other, in dictionary order
+    df         doc freq of every term, unsigned ints
+    postoff    (number of terms + 1) unsigned long longs, offset of every posting list in postings
+    postings   the compressed posting lists (compress.py) one after the other
+    docs       (number of docs + 1) unsigned ints, offset of every document ID in doctext
+    doctext    the document IDs one after the other, in collection order
+    norms      length |d| of the tf-idf vector of every document, doubles
+    maxweight  highest tf*idf / |d| of every term over its documents, doubles
+    tierlimit  term freq thresholds of tier 1 and tier 2, unsigned ints
+    tieroff    (2 * number of terms + 1) unsigned long longs, offset of the tier 1
+               and tier 2 doc lists of every term in tierdocs
+    tierdocs   the compressed doc lists (compress.encodedocs) of the tiers:
+               tier 1 has the docs with term freq >= tier 1 threshold, tier 2
+               the docs with term freq >= tier 2 threshold and below tier 1
+    champsize  size r of the champion lists, unsigned int
+    champoff   (number of terms + 1) unsigned ints, index of the champion list of
+               every term in champdocs
+    champdocs  the champion lists, unsigned ints: the r docs below tier 2 with
+               the highest tf*idf of every term, highest first, equal weights
+               in doc number order
+    doclen     length of every document, its number of terms, unsigned ints
+    cf         collection freq of every term, its number of occurrences in all
+               the documents, unsigned ints
+    tokens     number of terms in the collection, unsigned long long
+    indptr     (number of terms + 1) ints, index of the row of every term in
+               indices and data
+    indices    doc numbers of the rows, ints
+    data       tf*idf weights of the rows, doubles
+    analysis   stemming and stopwords options of the terms, "y" or "n" each
+    records    byte offset and length of the record of every document in the
+               collection, pairs of unsigned long longs, length 0 if unknown
+    collection size and modification time of the collection, unsigned long
+               long and double, then its absolute path
+
+indptr, indices and data are the term-document matrix of the tf-idf weights in
+compressed sparse row (CSR) layout, a row per term and a column per document,
+the way NumPy and SciPy store it:
+
+    scipy.sparse.csr_matrix((data, indices, indptr), shape=(terms, docs))
+
+with the arrays of Index.matrix(), or numpy.frombuffer() on the sections.
+
+Numbers are in native byte order and every section starts on an 8 byte
+boundary. An index written by sections(scoring=False), the one of part1, only has
+terms, termtext, df, postoff, postings, docs, doctext, analysis and records:
+enough to look up terms, read posting lists and display documents, not to
+rank them.
+
+The records table lets search.py read the title and authors of a result
+with one seek in the collection (cacm.record()) instead of a scan for its
+".I" line. The offsets are only good for the collection the index was built
+from, so collection() opens that one and checks it did not change, and
+document() checks the ID of the record it reads.
+
+invert.py -a does not write index.bin again: the documents it adds go to a
+delta segment next to it, index.bin.delta, written by delta() with the magic
+DELTA and read with load(), which returns the Merged view of index.bin and its
+delta. The delta has the lookup sections, analysis, records and collection of
+the added documents (records into the collection after they were appended to
+it, collection its size and modification time after that), and
+
+    doclen     the lengths of the added documents
+    norms      their |d|, weighted with the df of both segments and N the
+               number of terms of both
+    base       size and modification time of the index file it was added to
+
+The tiers, champion lists, highest weights and rows of the terms are not in
+the delta, Merged makes them from the merged posting list of a term when it is
+used. invert.py compacts the delta into a new index.bin when it gets too large.
+
+The dictionary is sorted the way invert.py sorts it, by lower cased
+term, so a term is found by binary search. The link of a term to its posting
+list is its index in the dictionary. Posting lists hold doc numbers, the
+index of the document in docs, which map back to the IDs of the collection.
+"""
+import os
+import math
+import heapq
+import mmap
+import struct
+from array import array
+import cacm
+import compress
+
+MAGIC = "IRINDEX4" #2: terms are lower cased when stemming is off too, 3: records, 4: collection
+DELTA = "IRDELTA1" #magic of the delta segment
+TIERS = [20, 10] #default term freq thresholds of tier 1 and tier 2
+CHAMPIONS = 20 #default size of the champion lists
+ANALYSIS = "yy" #default stemming and stopwords options
+HEADER = "=8sI" #magic, number of sections
+SECTION = "=16sQQ" #name, offset, length
+SOURCE = "=Qd" #size, modification time of a collection
+
+def write(filename, sections, magic=MAGIC):
+    """Write the named sections [ [name, data], ... ] to filename."""
+    out = open(filename, "wb")
+    out.write(struct.pack(HEADER, magic, len(sections)))
+    offset = struct.calcsize(HEADER) + len(sections)*struct.calcsize(SECTION)
+    starts = []
+    for name, data in sections:
+        offset = offset + (-offset % 8) #align to 8 bytes
+        starts.append(offset)
+        out.write(struct.pack(SECTION, name, offset, len(data)))
+        offset = offset + len(data)
+    for index in range(len(sections)):
+        out.write("\0" * (starts[index] - out.tell()))
+        out.write(sections[index][1])
+    out.close()
+
+def directory(data, magic=MAGIC):
+    """Return name -> (offset, length) of the sections of data, a file written
+    by write() with magic, or None if data does not start with magic."""
+    if len(data) < struct.calcsize(HEADER):
+        return None
+    header, count = struct.unpack_from(HEADER, data, 0)
+    if header != magic:
+        return None
+    sections = {}
+    start = struct.calcsize(HEADER)
+    for index in range(count):
+        name, offset, length = struct.unpack_from(SECTION, data, start + index*struct.calcsize(SECTION))
+        sections[name.rstrip("\0")] = (offset, length)
+    return sections
+
+def source(collection):
+    """Return the size and modification time of the file collection, packed
+    with SOURCE."""
+    stat = os.stat(collection)
+    return struct.pack(SOURCE, stat.st_size, stat.st_mtime)
+
+def table(strings):
+    """Return the offsets table and the text of a list of strings."""
+    offsets = array("I", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    return offsets.tostring(), "".join(strings)
+
+def weight(tf, idf):
+    """Return the tf*idf weight of a term freq, tf = log (term freq) + 1,
+    rounded to 2 decimals like idf."""
+    return round((round(math.log10(tf),2) + 1)*idf,2)
+
+def norms(dictionary, posting, numbers, ndocs, N=None):
+    """Return the array of the lengths |d| of the document vectors, the way
+    search.py and eval.py weight them: tf = log (term freq) + 1, idf = log (N /
+    df) with N the number of terms (len(dictionary) if it is not given), tf*idf
+    and |d| rounded to 2 decimals. numbers maps the document IDs in posting to
+    doc numbers."""
+    if N is None:
+        N = len(dictionary)
+    N = N+0.0
+    squares = [0]*ndocs
+    for index in range(len(dictionary)): #in dictionary order, like the vectors
+        post = posting[dictionary[index][2]]
+        idf = round(math.log10(N/dictionary[index][1]),2)
+        for a in range(len(post[0])):
+            w = weight(post[1][a], idf)
+            squares[numbers[post[0][a]]] = squares[numbers[post[0][a]]] + w*w
+    return array("d", [round(math.sqrt(square),2) for square in squares])
+
+def maxweights(dictionary, posting, numbers, lengths):
+    """Return the array of the highest weight tf*idf / |d| of every term in
+    the documents that have it, lengths the array from norms(). A query term
+    cannot add more than its query weight times this to a score."""
+    N = len(dictionary)+0.0
+    highest = array("d")
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        idf = round(math.log10(N/dictionary[index][1]),2)
+        best = 0
+        for a in range(len(post[0])):
+            length = lengths[numbers[post[0][a]]]
+            if length > 0:
+                best = max(best, weight(post[1][a], idf)/length)
+        highest.append(best)
+    return highest
+
+def tiers(dictionary, posting, numbers, limits):
+    """Return the offsets and the text of the compressed tier 1 and tier 2 doc
+    lists of every term, limits are the term freq thresholds of the tiers."""
+    lists = []
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        tier1 = []
+        tier2 = []
+        for a in range(len(post[0])):
+            if post[1][a] >= limits[0]:
+                tier1.append(numbers[post[0][a]])
+            elif post[1][a] >= limits[1]:
+                tier2.append(numbers[post[0][a]])
+        lists.append(compress.encodedocs(tier1))
+        lists.append(compress.encodedocs(tier2))
+    offsets = [0]
+    for data in lists:
+        offsets.append(offsets[-1] + len(data))
+    return struct.pack("=%dQ" % len(offsets), *offsets), "".join(lists)
+
+def champions(dictionary, posting, numbers, limit, r):
+    """Return the offsets and the doc numbers of the champion lists of every
+    term: the r docs with term freq below limit with the highest tf*idf."""
+    N = len(dictionary)+0.0
+    offsets = array("I", [0])
+    docs = array("I")
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        idf = round(math.log10(N/dictionary[index][1]),2)
+        weights = []
+        for a in range(len(post[0])):
+            if post[1][a] < limit:
+                weights.append((weight(post[1][a], idf), -numbers[post[0][a]]))
+        for w, doc in heapq.nlargest(r, weights):
+            docs.append(-doc)
+        offsets.append(len(docs))
+    return offsets, docs
+
+def matrix(dictionary, posting, numbers):
+    """Return the arrays indptr, indices and data of the term-document matrix
+    of the tf-idf weights, tf = log (term freq) + 1 and idf = log (N / df)
+    weighted like norms()."""
+    N = len(dictionary)+0.0
+    indptr = array("i", [0])
+    indices = array("i")
+    data = array("d")
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        idf = round(math.log10(N/dictionary[index][1]),2)
+        for a in range(len(post[0])):
+            indices.append(numbers[post[0][a]])
+            data.append(weight(post[1][a], idf))
+        indptr.append(len(indices))
+    return indptr, indices, data
+
+def doclengths(dictionary, posting, numbers, ndocs):
+    """Return the array of the lengths of the documents, the sum of the term
+    freqs of their terms."""
+    lengths = array("I", [0]*ndocs)
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        for a in range(len(post[0])):
+            lengths[numbers[post[0][a]]] = lengths[numbers[post[0][a]]] + post[1][a]
+    return lengths
+
+def sections(dictionary, posting, docs, limits=TIERS, r=CHAMPIONS, analysis=ANALYSIS, records=None, scoring=True, collection=None):
+    """Return the sections of the index of dictionary and posting, whose doc#
+    are the document IDs in docs, the list of all document IDs in collection
+    order. limits are the term freq thresholds of tier 1 and tier 2, r the
+    size of the champion lists and analysis the stemming and stopwords
+    options the terms were made with. records maps document IDs to the
+    (offset, length) of their record in collection, the file name of the
+    collection (cacm.offsets()). If scoring is False only the sections to look up terms, posting lists and
+    records are returned, without the ones of the scoring models."""
+    numbers = {} #document ID -> doc number
+    for doc in range(len(docs)):
+        numbers[docs[doc]] = doc
+    encoded = []
+    for index in range(len(dictionary)):
+        post = posting[dictionary[index][2]]
+        post = [[numbers[id] for id in post[0]], post[1], post[2]]
+        encoded.append(compress.encode(post))
+    df = array("I", [d[1] for d in dictionary])
+    postoff = [0]
+    for data in encoded:
+        postoff.append(postoff[-1] + len(data))
+    terms, termtext = table([d[0] for d in dictionary])
+    docoff, doctext = table(docs)
+    if records is None:
+        records = {}
+    places = [] #offset and length of the record of every doc
+    for id in docs:
+        places.extend(records.get(id, (0, 0)))
+    lookup = [["terms", terms],
+              ["termtext", termtext],
+              ["df", df.tostring()],
+              ["postoff", struct.pack("=%dQ" % len(postoff), *postoff)],
+              ["postings", "".join(encoded)],
+              ["docs", docoff],
+              ["doctext", doctext]]
+    src = struct.pack(SOURCE, 0, 0) #no collection
+    if collection is not None:
+        src = source(collection) + os.path.abspath(collection)
+    options = [["analysis", analysis],
+               ["records", struct.pack("=%dQ" % len(places), *places)],
+               ["collection", src]]
+    if not scoring:
+        return lookup + options
+    lengths = norms(dictionary, posting, numbers, len(docs))
+    highest = maxweights(dictionary, posting, numbers, lengths)
+    tieroff, tierdocs = tiers(dictionary, posting, numbers, limits)
+    champoff, champdocs = champions(dictionary, posting, numbers, limits[1], r)
+    doclen = doclengths(dictionary, posting, numbers, len(docs))
+    cf = array("I", [sum(posting[d[2]][1]) for d in dictionary])
+    indptr, indices, data = matrix(dictionary, posting, numbers)
+    return lookup + [["norms", lengths.tostring()],
+            ["maxweight", highest.tostring()],
+            ["tierlimit", array("I", limits).tostring()],
+            ["tieroff", tieroff],
+            ["tierdocs", tierdocs],
+            ["champsize", array("I", [r]).tostring()],
+            ["champoff", champoff.tostring()],
+            ["champdocs", champdocs.tostring()],
+            ["doclen", doclen.tostring()],
+            ["cf", cf.tostring()],
+            ["tokens", struct.pack("=Q", sum(doclen))],
+            ["indptr", indptr.tostring()],
+            ["indices", indices.tostring()],
+            ["data", data.tostring()]] + options
+
+def delta(dictionary, posting, docs, index, analysis=ANALYSIS, records=None, collection=None):
+    """Return the sections of the delta segment of the documents in docs,
+    added to index, an Index: the sections(scoring=False) of dictionary and
+    posting, the doclen and norms of the documents and the source of the file
+    of index. The norms are weighted like the ones of a full build with both
+    segments, so only the norms of the documents of index are stale."""
+    numbers = {} #document ID -> doc number
+    for doc in range(len(docs)):
+        numbers[docs[doc]] = doc
+    merged = [] #term, doc freq in both segments, link
+    N = len(index)
+    for term, df, link in dictionary:
+        found = index.find(term)
+        if found == -1:
+            N = N+1
+            merged.append([term, df, link])
+        else:
+            merged.append([term, df + index.df(found), link])
+    lengths = norms(merged, posting, numbers, len(docs), N)
+    doclen = doclengths(dictionary, posting, numbers, len(docs))
+    return sections(dictionary, posting, docs, analysis=analysis, records=records, scoring=False, collection=collection) + \
+           [["doclen", doclen.tostring()],
+            ["norms", lengths.tostring()],
+            ["base", source(index.file.name)]]
+
+class Index:
+    """A memory mapped index.bin, or a delta segment with magic DELTA."""
+
+    def __init__(self, filename="index.bin", magic=MAGIC):
+        self.file = open(filename, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections = directory(self.map, magic) #name -> (offset, length)
+        if self.sections is None:
+            raise ValueError(filename + " is not an index file, please run invert.py")
+        self.terms = self.sections["terms"][0]
+        self.termtext = self.sections["termtext"][0]
+        self.dfoff = self.sections["df"][0]
+        self.postoff = self.sections["postoff"][0]
+        self.postings = self.sections["postings"][0]
+        self.docs = self.sections["docs"][0]
+        self.doctext = self.sections["doctext"][0]
+        self.scoring = "maxweight" in self.sections #False without the sections of the scoring models (sections(scoring=False), delta())
+        if "norms" in self.sections:
+            self.norms = self.sections["norms"][0]
+            self.doclens = self.sections["doclen"][0]
+        if "base" in self.sections:
+            offset, length = self.sections["base"]
+            self.base = self.map[offset:offset+length] #size and modification time of the index of a delta
+        if self.scoring:
+            self.maxweights = self.sections["maxweight"][0]
+            self.tieroff = self.sections["tieroff"][0]
+            self.tierdocs = self.sections["tierdocs"][0]
+            self.limits = list(struct.unpack_from("=II", self.map, self.sections["tierlimit"][0]))
+            self.r = struct.unpack_from("=I", self.map, self.sections["champsize"][0])[0] #size of the champion lists
+            self.champoff = self.sections["champoff"][0]
+            self.champdocs = self.sections["champdocs"][0]
+            self.cfoff = self.sections["cf"][0]
+            self.tokens = struct.unpack_from("=Q", self.map, self.sections["tokens"][0])[0] #number of terms in the collection
+            self.indptr = self.sections["indptr"][0]
+            self.indices = self.sections["indices"][0]
+            self.data = self.sections["data"][0]
+        offset = self.sections["analysis"][0]
+        self.stemming = self.map[offset] #stemming option, "y" or "n"
+        self.stopword = self.map[offset+1] #stopwords option, "y" or "n"
+        self.records = self.sections["records"][0]
+        offset, length = self.sections["collection"]
+        self.source = self.map[offset:offset+struct.calcsize(SOURCE)] #size and modification time of the collection
+        self.collection = self.map[offset+struct.calcsize(SOURCE):offset+length] #its path, "" if not known
+        self.count = self.sections["df"][1] // 4 #number of terms
+        self.ndocs = self.sections["docs"][1] // 4 - 1 #number of docs
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def term(self, link):
+        """Return the term with the link."""
+        start, end = struct.unpack_from("=II", self.map, self.terms + 4*link)
+        return self.map[self.termtext+start:self.termtext+end]
+
+    def df(self, link):
+        """Return the doc freq of the term with the link."""
+        return struct.unpack_from("=I", self.map, self.dfoff + 4*link)[0]
+
+    def find(self, term):
+        """Return the link of term, or -1 if term is not in the dictionary."""
+        key = term.lower()
+        lo = 0
+        hi = self.count
+        while lo < hi: #first term not lower than key
+            mid = (lo+hi) // 2
+            if self.term(mid).lower() < key:
+                lo = mid+1
+            else:
+                hi = mid
+        #terms that only differ in case are next to each other
+        while (lo < self.count) and (self.term(lo).lower() == key):
+            if self.term(lo) == term:
+                return lo
+            lo = lo+1
+        return -1
+
+    def encoded(self, link):
+        """Return the compressed posting list of the term with the link."""
+        start, end = struct.unpack_from("=QQ", self.map, self.postoff + 8*link)
+        return self.map[self.postings+start:self.postings+end]
+
+    def posting(self, link, positions=True):
+        """Return the decoded posting list of the term with the link."""
+        return compress.decode(self.encoded(link), positions)
+
+    def docid(self, doc):
+        """Return the document ID of the doc number."""
+        start, end = struct.unpack_from("=II", self.map, self.docs + 4*doc)
+        return self.map[self.doctext+start:self.doctext+end]
+
+    def record(self, doc):
+        """Return the (offset, length) of the record of doc, a doc number, in
+        the collection, length 0 if it is not known."""
+        return struct.unpack_from("=QQ", self.map, self.records + 16*doc)
+
+    def norm(self, doc):
+        """Return the length |d| of the document vector of the doc number."""
+        return struct.unpack_from("=d", self.map, self.norms + 8*doc)[0]
+
+    def maxweight(self, link):
+        """Return the highest tf*idf / |d| of the term with the link."""
+        return struct.unpack_from("=d", self.map, self.maxweights + 8*link)[0]
+
+    def tier(self, link, level):
+        """Return the array of doc numbers in tier level (1 or 2) of the term
+        with the link."""
+        start, end = struct.unpack_from("=QQ", self.map, self.tieroff + 8*(2*link + level-1))
+        return compress.decodedocs(self.map[self.tierdocs+start:self.tierdocs+end])
+
+    def champions(self, link):
+        """Return the champion list of the term with the link, doc numbers
+        with the highest weight first."""
+        start, end = struct.unpack_from("=II", self.map, self.champoff + 4*link)
+        return struct.unpack_from("=%dI" % (end-start), self.map, self.champdocs + 4*start)
+
+    def doclen(self, doc):
+        """Return the length of the doc number, its number of terms."""
+        return struct.unpack_from("=I", self.map, self.doclens + 4*doc)[0]
+
+    def cf(self, link):
+        """Return the collection freq of the term with the link."""
+        return struct.unpack_from("=I", self.map, self.cfoff + 4*link)[0]
+
+    def row(self, link):
+        """Return the arrays of the doc numbers and the tf*idf weights of the
+        row of the term with the link in the term-document matrix."""
+        start, end = struct.unpack_from("=ii", self.map, self.indptr + 4*link)
+        docs = array("i", self.map[self.indices+4*start:self.indices+4*end])
+        weights = array("d", self.map[self.data+8*start:self.data+8*end])
+        return docs, weights
+
+    def matrix(self):
+        """Return the arrays data, indices and indptr of the whole
+        term-document matrix, a row per term."""
+        arrays = []
+        for name, code in (("data", "d"), ("indices", "i"), ("indptr", "i")):
+            offset, length = self.sections[name]
+            arrays.append(array(code, self.map[offset:offset+length]))
+        return arrays
+
+    def docids(self):
+        """Return the list of all document IDs, the doc number is the index."""
+        return [self.docid(doc) for doc in range(self.ndocs)]
+
+    def dictionary(self):
+        """Return the whole dictionary as a list of [term, doc freq, link]."""
+        return [[self.term(link), self.df(link), link] for link in range(self.count)]
+
+class Merged:
+    """An index and its delta segment read as one index, with the methods of
+    Index. The terms of the index keep their links and the terms only in the
+    delta are linked after them, the docs of the delta are numbered after the
+    docs of the index and the posting list of a term is the one of the index
+    followed by the one of the delta.
+
+    The tiers, champion lists, highest weights and rows of a term are made
+    from its merged posting list when they are used, with the idf of both
+    segments, the way a full build writes them. The norms of the documents of
+    the index are the ones it was written with, without the terms of the
+    delta, until it is compacted (invert.py -z)."""
+
+    def __init__(self, index, delta):
+        self.index = index
+        self.delta = delta
+        self.extra = [] #links in delta of the terms only in delta
+        self.added = {} #link in delta -> link of the terms only in delta
+        self.links = array("i") #link in delta of every link of index, -1 if the term is not in delta
+        self.links.fromlist([-1]*len(index))
+        for link in range(len(delta)):
+            found = index.find(delta.term(link))
+            if found == -1:
+                self.added[link] = len(index) + len(self.extra)
+                self.extra.append(link)
+            else:
+                self.links[found] = link
+        self.count = len(index) + len(self.extra)
+        self.ndocs = index.ndocs + delta.ndocs
+        self.scoring = index.scoring
+        self.limits = index.limits
+        self.r = index.r
+        self.tokens = index.tokens + sum(array("I", delta.map[delta.doclens:delta.doclens+4*delta.ndocs]))
+        self.stemming = index.stemming
+        self.stopword = index.stopword
+        self.source = delta.source #the collection after the documents of delta were appended
+        self.collection = delta.collection
+        self.lists = {} #(link, positions) -> merged posting list, of the terms used so far
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.index.close()
+        self.delta.close()
+
+    def parts(self, link):
+        """Return the links of the term with the link in the index and in the
+        delta, -1 where it is not."""
+        if link < len(self.index):
+            return link, self.links[link]
+        return -1, self.extra[link - len(self.index)]
+
+    def term(self, link):
+        """Return the term with the link."""
+        if link < len(self.index):
+            return self.index.term(link)
+        return self.delta.term(self.extra[link - len(self.index)])
+
+    def df(self, link):
+        """Return the doc freq of the term with the link."""
+        first, second = self.parts(link)
+        df = 0
+        if first != -1:
+            df = self.index.df(first)
+        if second != -1:
+            df = df + self.delta.df(second)
+        return df
+
+    def find(self, term):
+        """Return the link of term, or -1 if term is not in the dictionary."""
+        link = self.index.find(term)
+        if link != -1:
+            return link
+        return self.added.get(self.delta.find(term), -1)
+
+    def posting(self, link, positions=True):
+        """Return the merged posting list of the term with the link, like
+        Index.posting()."""
+        if (link, positions) not in self.lists:
+            first, second = self.parts(link)
+            post = [array("i"), array("i")]
+            if positions:
+                post.append([])
+            if first != -1:
+                post = self.index.posting(first, positions)
+            if second != -1:
+                more = self.delta.posting(second, positions)
+                post[0].extend([self.index.ndocs + doc for doc in more[0]])
+                for i in range(1, len(post)):
+                    post[i].extend(more[i])
+            self.lists[(link, positions)] = post
+        return self.lists[(link, positions)]
+
+    def encoded(self, link):
+        """Return the compressed merged posting list of the term with the link."""
+        return compress.encode(self.posting(link))
+
+    def idf(self, link):
+        """Return the idf of the term with the link in both segments."""
+        return round(math.log10((self.count+0.0)/self.df(link)),2)
+
+    def segment(self, doc):
+        """Return the segment of the doc number and its doc number there."""
+        if doc < self.index.ndocs:
+            return self.index, doc
+        return self.delta, doc - self.index.ndocs
+
+    def docid(self, doc):
+        """Return the document ID of the doc number."""
+        segment, doc = self.segment(doc)
+        return segment.docid(doc)
+
+    def record(self, doc):
+        """Return the (offset, length) of the record of doc in the collection."""
+        segment, doc = self.segment(doc)
+        return segment.record(doc)
+
+    def norm(self, doc):
+        """Return the length |d| of the document vector of the doc number."""
+        segment, doc = self.segment(doc)
+        return segment.norm(doc)
+
+    def doclen(self, doc):
+        """Return the length of the doc number, its number of terms."""
+        segment, doc = self.segment(doc)
+        return segment.doclen(doc)
+
+    def maxweight(self, link):
+        """Return the highest tf*idf / |d| of the term with the link."""
+        post = self.posting(link, False)
+        idf = self.idf(link)
+        best = 0
+        for a in range(len(post[0])):
+            length = self.norm(post[0][a])
+            if length > 0:
+                best = max(best, weight(post[1][a], idf)/length)
+        return best
+
+    def tier(self, link, level):
+        """Return the array of doc numbers in tier level (1 or 2) of the term
+        with the link."""
+        post = self.posting(link, False)
+        high = 0 #no upper limit in tier 1
+        if level == 2:
+            high = self.limits[0]
+        docs = array("i")
+        for a in range(len(post[0])):
+            if (post[1][a] >= self.limits[level-1]) and ((high == 0) or (post[1][a] < high)):
+                docs.append(post[0][a])
+        return docs
+
+    def champions(self, link):
+        """Return the champion list of the term with the link, doc numbers
+        with the highest weight first."""
+        post = self.posting(link, False)
+        idf = self.idf(link)
+        weights = [(weight(post[1][a], idf), -post[0][a]) for a in range(len(post[0])) if post[1][a] < self.limits[1]]
+        return tuple([-doc for w, doc in heapq.nlargest(self.r, weights)])
+
+    def cf(self, link):
+        """Return the collection freq of the term with the link."""
+        return sum(self.posting(link, False)[1])
+
+    def row(self, link):
+        """Return the arrays of the doc numbers and the tf*idf weights of the
+        row of the term with the link in the term-document matrix."""
+        post = self.posting(link, False)
+        idf = self.idf(link)
+        return array("i", post[0]), array("d", [weight(tf, idf) for tf in post[1]])
+
+    def matrix(self):
+        """Return the arrays data, indices and indptr of the whole
+        term-document matrix, a row per term."""
+        data = array("d")
+        indices = array("i")
+        indptr = array("i", [0])
+        for link in range(self.count):
+            docs, weights = self.row(link)
+            indices.extend(docs)
+            data.extend(weights)
+            indptr.append(len(indices))
+        return [data, indices, indptr]
+
+    def docids(self):
+        """Return the list of all document IDs, the doc number is the index."""
+        return self.index.docids() + self.delta.docids()
+
+    def dictionary(self):
+        """Return the whole dictionary as a list of [term, doc freq, link]."""
+        return [[self.term(link), self.df(link), link] for link in range(self.count)]
+
+def segment(filename="index.bin"):
+    """Return the delta segment of the index file filename, an Index, or None
+    if it has none. Raise ValueError if the delta was not added to filename as
+    it is now."""
+    name = filename + ".delta"
+    if not os.path.exists(name):
+        return None
+    delta = Index(name, DELTA)
+    if delta.base != source(filename):
+        delta.close()
+        raise ValueError(name + " was not added to " + filename + ", please run invert.py")
+    return delta
+
+def load(filename="index.bin"):
+    """Return the Index of the index file filename, or the Merged view of it
+    and its delta segment if invert.py -a wrote one."""
+    index = Index(filename)
+    delta = segment(filename)
+    if delta is None:
+        return index
+    return Merged(index, delta)
+
+def collection(index, filename=None):
+    """Return the collection the records of index point into, opened in
+    binary mode: filename if it is given, else the collection index was built
+    from. Raise ValueError if that collection changed since, its size or
+    modification time are not the ones in index, or if filename does not have
+    the size of the collection index was built from."""
+    if filename is None:
+        if not index.collection:
+            raise ValueError("the index does not know its collection, please run invert.py")
+        filename = index.collection
+        if source(filename) != index.source:
+            raise ValueError(filename + " changed since the index was built, please run invert.py")
+    elif source(filename)[:8] != index.source[:8]: #a copy keeps the size, not the modification time
+        raise ValueError(filename + " is not the collection the index was built from")
+    return open(filename, "rb")
+
+def document(index, infile, doc):
+    """Return the fields of the record of doc, a doc number, read from infile,
+    the file of collection(), with one seek (cacm.record()). Raise ValueError
+    if the record there is not the one of doc."""
+    offset, length = index.record(doc)
+    id, fields = cacm.record(infile, offset, length)
+    if id != index.docid(doc):
+        raise ValueError("the record at byte %d of %s is not document %s, please run invert.py" % (offset, infile.name, index.docid(doc)))
+    return fields
+
+class Dictionary:
+    """The dictionary of an Index as a read only list of [term, doc freq, link
+    to posting], read from the index when used."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, link):
+        return [self.index.term(link), self.index.df(link), link]
+
+class Encoded:
+    """The compressed posting lists of an Index as a read only list, to use with
+    compress.Postings."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, link):
+        return self.index.encoded(link)
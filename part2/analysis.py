@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Text analysis shared by invert.py, search.py, eval.py and test.py.
+
+The title and abstract of a document, and a query, are split into tokens the
+same way: a token is a run of chars between white space, lower cased and with
+punctuation removed, one str.translate with the table FOLD. tokenize() yields
+every token with its position and its offsets in the text, tokens() returns
+the list of the tokens of the text lines without them, for indexing.
+
+The terms are made from the tokens by an analyzer chain, Analyzer: a list of
+steps run on every token in turn, lowercase, punctuation, then stemming and
+stopping if these options are on (chain()). A step only looks at its token, so
+Analyzer.vocabulary() runs the chain once for every distinct token of the
+collection and the tokens are then mapped to their terms, the chain takes time
+in the number of distinct tokens instead of the number of tokens. Another
+chain is another list of steps. chunks() returns the tokens before the chain,
+as they are in the text, the ones tokenfile.py caches.
+
+The stopwords of common_words are read once per process into a frozenset, so
+checking a term is one hash lookup instead of a pass over the file. With a
+stemmer the stopwords are stemmed too, so they match stemmed terms.
+
+A word is stemmed many times, the collection has far more words than distinct
+words. Stemmer keeps the stem of every word it has seen, so a word is only
+stemmed the first time, or the stems of the most recently used words if it is
+given a size (LRU). The stems can be saved to a file and loaded by a later
+build, so it starts with them.
+"""
+import os
+import re
+import string
+from collections import OrderedDict
+
+STOPWORDS = "common_words"
+
+word = re.compile("[a-zA-Z]+") #a word to stem, same as the c.isalpha() loop
+chunk = re.compile(r"\S+") #a token before punctuation is removed
+FOLD = string.maketrans(string.ascii_uppercase, string.ascii_lowercase) #lower case only, punctuation is deleted by passing string.punctuation to translate() too
+
+loaded = {} #filename -> frozenset of the stopwords, not stemmed
+
+def stopwords(filename=STOPWORDS, stemmer=None):
+    """Return the frozenset of the stopwords in filename, read once. If a
+    stemmer is given, the stopwords stemmed by it are returned, stemmed on
+    every call so different stemmers get their own stems."""
+    if filename not in loaded:
+        loaded[filename] = frozenset(open(filename, "r").read().split())
+    if stemmer is None:
+        return loaded[filename]
+    return frozenset([stemmer.stem(w, 0, len(w)-1) for w in loaded[filename]])
+
+class Stemmer(object):
+    """Memoizing stemmer around stemmer, a PorterStemmer. Words are lower
+    cased, the stem of a word is kept in cache after it is first stemmed.
+    hits and misses count the words that were and were not in cache."""
+
+    def __init__(self, stemmer, size=None):
+        """Keep the stems of at most size words, the most recently used ones,
+        or of every word if size is None."""
+        self.stemmer = stemmer
+        self.size = size
+        self.cache = {} #word -> stem
+        if size is not None:
+            self.cache = OrderedDict() #oldest used first
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+    def stem(self, p, i=0, j=None):
+        """Return the stem of p[i:j+1] lower cased, same as
+        PorterStemmer.stem(p, i, j) on a lower case word."""
+        if j is None:
+            j = len(p)-1
+        word = p[i:j+1].lower()
+        if not word:
+            return word
+        if word in self.cache:
+            self.hits = self.hits+1
+            stem = self.cache[word]
+            if self.size is not None: #most recently used, move it to the end
+                del self.cache[word]
+                self.cache[word] = stem
+            return stem
+        self.misses = self.misses+1
+        stem = self.stemmer.stem(word, 0, len(word)-1)
+        self.cache[word] = stem
+        if (self.size is not None) and (len(self.cache) > self.size):
+            self.cache.popitem(last=False) #least recently used
+        return stem
+
+    def load(self, filename):
+        """Add the stems saved in filename, if it exists, to the cache."""
+        if not os.path.exists(filename):
+            return
+        for line in open(filename, "r"):
+            word, stem = line.split()
+            self.cache[word] = stem
+        if self.size is not None:
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+
+    def save(self, filename):
+        """Write the stems in cache to filename, one "word stem" per line."""
+        out = open(filename, "w")
+        for word in sorted(self.cache):
+            out.write(word + " " + self.cache[word] + "\n")
+        out.close()
+
+def tokenize(text):
+    """Yield [pos, token, start, end] for the tokens of text in order, pos
+    counts from 1 and text[start:end] is the token before it is lower cased
+    and its punctuation removed. A run of punctuation is not a token."""
+    pos = 0
+    for m in chunk.finditer(text):
+        token = m.group().translate(FOLD, string.punctuation)
+        if token:
+            pos = pos+1
+            yield [pos, token, m.start(), m.end()]
+
+def tokens(lines):
+    """Return the list of the tokens of the text lines in order, the same
+    tokens as tokenize()."""
+    return " ".join(lines).translate(FOLD, string.punctuation).split()
+
+def chunks(lines):
+    """Return the list of the runs of chars between white space of the text
+    lines in order, the tokens before they are lower cased and their
+    punctuation removed."""
+    return " ".join(lines).split()
+
+#===============================================================================
+#Analyzer chain
+#A step is a function of a token that returns its term, "" if the token is not
+#a token at all, a run of punctuation, or None to leave it out, a stopword.
+
+def lowercase(token):
+    """Step that lower cases token."""
+    return token.translate(FOLD)
+
+def punctuation(token):
+    """Step that removes the punctuation of token."""
+    return token.translate(None, string.punctuation)
+
+def stemming(stemmer):
+    """Return the step that stems every word of a token with stemmer."""
+    stem = lambda m: stemmer.stem(m.group(), 0, len(m.group())-1)
+    return lambda token: word.sub(stem, token)
+
+def stopping(stopwords):
+    """Return the step that leaves out the tokens in stopwords."""
+    return lambda token: (token not in stopwords) and token or None
+
+class Analyzer(object):
+    """Chain of steps from a token to its term, run in order."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def term(self, token):
+        """Return the term of token, "" if it is not a token or None if it is
+        left out."""
+        for step in self.steps:
+            if not token:
+                return token
+            token = step(token)
+        return token
+
+    def vocabulary(self, tokens):
+        """Return token -> term for the distinct tokens."""
+        terms = {}
+        for token in set(tokens):
+            terms[token] = self.term(token)
+        return terms
+
+    def terms(self, tokens, vocabulary=None):
+        """Yield [pos, term] for the tokens in order, every token mapped to
+        its term by vocabulary if it is given, else by the chain. pos counts
+        every token, the ones left out too, but they are not yielded."""
+        if vocabulary is None:
+            vocabulary = self.vocabulary(tokens)
+        pos = 0 #word position counter
+        for token in tokens:
+            term = vocabulary[token]
+            if term == "": #not a token
+                continue
+            pos = pos+1
+            if term is not None:
+                yield [pos, term]
+
+    def analyze(self, text):
+        """Return the list of the terms of text, a query."""
+        return [term for pos, term in self.terms(text.split())]
+
+def chain(stemmer=None, stopwords=frozenset()):
+    """Return the Analyzer of the documents and the queries: lower case,
+    remove punctuation, stem with stemmer if it is given and leave out the
+    stopwords. Stopwords are left out after stemming, the way they always
+    were."""
+    steps = [lowercase, punctuation]
+    if stemmer is not None:
+        steps.append(stemming(stemmer))
+    if stopwords:
+        steps.append(stopping(stopwords))
+    return Analyzer(steps)
+
+def analyze(text, stemmer=None, stopwords=frozenset()):
+    """Return the list of the terms of text, a query, the same terms as the
+    documents with the stemmer and the stopwords."""
+    return chain(stemmer, stopwords).analyze(text)
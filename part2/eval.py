@@ -1,387 +1,167 @@
 #!/usr/bin/env python
-import cPickle
-import time
-import math
-import string
-
-"""Porter Stemming Algorithm
-This is the Porter stemming algorithm, ported to Python from the
-version coded up in ANSI C by the author. It may be be regarded
-as canonical, in that it follows the algorithm presented in
-
-Porter, 1980, An algorithm for suffix stripping, Program, Vol. 14,
-no. 3, pp 130-137,
-
-only differing from it at the points maked --DEPARTURE-- below.
-
-See also http://www.tartarus.org/~martin/PorterStemmer
-
-The algorithm as described in the paper could be exactly replicated
-by adjusting the points of DEPARTURE, but this is barely necessary,
-because (a) the points of DEPARTURE are definitely improvements, and
-(b) no encoding of the Porter stemmer I have seen is anything like
-as exact as this version, even with the points of DEPARTURE!
-
-Vivake Gupta (v@nano.com)
-
-Release 1: January 2001
-
-Further adjustments by Santiago Bruno (bananabruno@gmail.com)
-to allow word input not restricted to one word per line, leading
-to:
-
-release 2: July 2008
-"""
-
 import sys
-
-class PorterStemmer:
-
-    def __init__(self):
-        """The main part of the stemming algorithm starts here.
-        b is a buffer holding a word to be stemmed. The letters are in b[k0],
-        b[k0+1] ... ending at b[k]. In fact k0 = 0 in this demo program. k is
-        readjusted downwards as the stemming progresses. Zero termination is
-        not in fact used in the algorithm.
-
-        Note that only lower case sequences are stemmed. Forcing to lower case
-        should be done before stem(...) is called.
-        """
-
-        self.b = ""  # buffer for word to be stemmed
-        self.k = 0
-        self.k0 = 0
-        self.j = 0   # j is a general offset into the string
-
-    def cons(self, i):
-        """cons(i) is TRUE <=> b[i] is a consonant."""
-        if self.b[i] == 'a' or self.b[i] == 'e' or self.b[i] == 'i' or self.b[i] == 'o' or self.b[i] == 'u':
-            return 0
-        if self.b[i] == 'y':
-            if i == self.k0:
-                return 1
-            else:
-                return (not self.cons(i - 1))
-        return 1
-
-    def m(self):
-        """m() measures the number of consonant sequences between k0 and j.
-        if c is a consonant sequence and v a vowel sequence, and <..>
-        indicates arbitrary presence,
-
-           <c><v>       gives 0
-           <c>vc<v>     gives 1
-           <c>vcvc<v>   gives 2
-           <c>vcvcvc<v> gives 3
-           ....
-        """
-        n = 0
-        i = self.k0
-        while 1:
-            if i > self.j:
-                return n
-            if not self.cons(i):
-                break
-            i = i + 1
-        i = i + 1
-        while 1:
-            while 1:
-                if i > self.j:
-                    return n
-                if self.cons(i):
-                    break
-                i = i + 1
-            i = i + 1
-            n = n + 1
-            while 1:
-                if i > self.j:
-                    return n
-                if not self.cons(i):
-                    break
-                i = i + 1
-            i = i + 1
-
-    def vowelinstem(self):
-        """vowelinstem() is TRUE <=> k0,...j contains a vowel"""
-        for i in range(self.k0, self.j + 1):
-            if not self.cons(i):
-                return 1
-        return 0
-
-    def doublec(self, j):
-        """doublec(j) is TRUE <=> j,(j-1) contain a double consonant."""
-        if j < (self.k0 + 1):
-            return 0
-        if (self.b[j] != self.b[j-1]):
-            return 0
-        return self.cons(j)
-
-    def cvc(self, i):
-        """cvc(i) is TRUE <=> i-2,i-1,i has the form consonant - vowel - consonant
-        and also if the second c is not w,x or y. this is used when trying to
-        restore an e at the end of a short  e.g.
-
-           cav(e), lov(e), hop(e), crim(e), but
-           snow, box, tray.
-        """
-        if i < (self.k0 + 2) or not self.cons(i) or self.cons(i-1) or not self.cons(i-2):
-            return 0
-        ch = self.b[i]
-        if ch == 'w' or ch == 'x' or ch == 'y':
-            return 0
-        return 1
-
-    def ends(self, s):
-        """ends(s) is TRUE <=> k0,...k ends with the string s."""
-        length = len(s)
-        if s[length - 1] != self.b[self.k]: # tiny speed-up
-            return 0
-        if length > (self.k - self.k0 + 1):
-            return 0
-        if self.b[self.k-length+1:self.k+1] != s:
-            return 0
-        self.j = self.k - length
-        return 1
-
-    def setto(self, s):
-        """setto(s) sets (j+1),...k to the characters in the string s, readjusting k."""
-        length = len(s)
-        self.b = self.b[:self.j+1] + s + self.b[self.j+length+1:]
-        self.k = self.j + length
-
-    def r(self, s):
-        """r(s) is used further down."""
-        if self.m() > 0:
-            self.setto(s)
-
-    def step1ab(self):
-        """step1ab() gets rid of plurals and -ed or -ing. e.g.
-
-           caresses  ->  caress
-           ponies    ->  poni
-           ties      ->  ti
-           caress    ->  caress
-           cats      ->  cat
-
-           feed      ->  feed
-           agreed    ->  agree
-           disabled  ->  disable
-
-           matting   ->  mat
-           mating    ->  mate
-           meeting   ->  meet
-           milling   ->  mill
-           messing   ->  mess
-
-           meetings  ->  meet
-        """
-        if self.b[self.k] == 's':
-            if self.ends("sses"):
-                self.k = self.k - 2
-            elif self.ends("ies"):
-                self.setto("i")
-            elif self.b[self.k - 1] != 's':
-                self.k = self.k - 1
-        if self.ends("eed"):
-            if self.m() > 0:
-                self.k = self.k - 1
-        elif (self.ends("ed") or self.ends("ing")) and self.vowelinstem():
-            self.k = self.j
-            if self.ends("at"):   self.setto("ate")
-            elif self.ends("bl"): self.setto("ble")
-            elif self.ends("iz"): self.setto("ize")
-            elif self.doublec(self.k):
-                self.k = self.k - 1
-                ch = self.b[self.k]
-                if ch == 'l' or ch == 's' or ch == 'z':
-                    self.k = self.k + 1
-            elif (self.m() == 1 and self.cvc(self.k)):
-                self.setto("e")
-
-    def step1c(self):
-        """step1c() turns terminal y to i when there is another vowel in the stem."""
-        if (self.ends("y") and self.vowelinstem()):
-            self.b = self.b[:self.k] + 'i' + self.b[self.k+1:]
-
-    def step2(self):
-        """step2() maps double suffices to single ones.
-        so -ization ( = -ize plus -ation) maps to -ize etc. note that the
-        string before the suffix must give m() > 0.
-        """
-        if self.b[self.k - 1] == 'a':
-            if self.ends("ational"):   self.r("ate")
-            elif self.ends("tional"):  self.r("tion")
-        elif self.b[self.k - 1] == 'c':
-            if self.ends("enci"):      self.r("ence")
-            elif self.ends("anci"):    self.r("ance")
-        elif self.b[self.k - 1] == 'e':
-            if self.ends("izer"):      self.r("ize")
-        elif self.b[self.k - 1] == 'l':
-            if self.ends("bli"):       self.r("ble") # --DEPARTURE--
-            # To match the published algorithm, replace this phrase with
-            #   if self.ends("abli"):      self.r("able")
-            elif self.ends("alli"):    self.r("al")
-            elif self.ends("entli"):   self.r("ent")
-            elif self.ends("eli"):     self.r("e")
-            elif self.ends("ousli"):   self.r("ous")
-        elif self.b[self.k - 1] == 'o':
-            if self.ends("ization"):   self.r("ize")
-            elif self.ends("ation"):   self.r("ate")
-            elif self.ends("ator"):    self.r("ate")
-        elif self.b[self.k - 1] == 's':
-            if self.ends("alism"):     self.r("al")
-            elif self.ends("iveness"): self.r("ive")
-            elif self.ends("fulness"): self.r("ful")
-            elif self.ends("ousness"): self.r("ous")
-        elif self.b[self.k - 1] == 't':
-            if self.ends("aliti"):     self.r("al")
-            elif self.ends("iviti"):   self.r("ive")
-            elif self.ends("biliti"):  self.r("ble")
-        elif self.b[self.k - 1] == 'g': # --DEPARTURE--
-            if self.ends("logi"):      self.r("log")
-        # To match the published algorithm, delete this phrase
-
-    def step3(self):
-        """step3() dels with -ic-, -full, -ness etc. similar strategy to step2."""
-        if self.b[self.k] == 'e':
-            if self.ends("icate"):     self.r("ic")
-            elif self.ends("ative"):   self.r("")
-            elif self.ends("alize"):   self.r("al")
-        elif self.b[self.k] == 'i':
-            if self.ends("iciti"):     self.r("ic")
-        elif self.b[self.k] == 'l':
-            if self.ends("ical"):      self.r("ic")
-            elif self.ends("ful"):     self.r("")
-        elif self.b[self.k] == 's':
-            if self.ends("ness"):      self.r("")
-
-    def step4(self):
-        """step4() takes off -ant, -ence etc., in context <c>vcvc<v>."""
-        if self.b[self.k - 1] == 'a':
-            if self.ends("al"): pass
-            else: return
-        elif self.b[self.k - 1] == 'c':
-            if self.ends("ance"): pass
-            elif self.ends("ence"): pass
-            else: return
-        elif self.b[self.k - 1] == 'e':
-            if self.ends("er"): pass
-            else: return
-        elif self.b[self.k - 1] == 'i':
-            if self.ends("ic"): pass
-            else: return
-        elif self.b[self.k - 1] == 'l':
-            if self.ends("able"): pass
-            elif self.ends("ible"): pass
-            else: return
-        elif self.b[self.k - 1] == 'n':
-            if self.ends("ant"): pass
-            elif self.ends("ement"): pass
-            elif self.ends("ment"): pass
-            elif self.ends("ent"): pass
-            else: return
-        elif self.b[self.k - 1] == 'o':
-            if self.ends("ion") and (self.b[self.j] == 's' or self.b[self.j] == 't'): pass
-            elif self.ends("ou"): pass
-            # takes care of -ous
-            else: return
-        elif self.b[self.k - 1] == 's':
-            if self.ends("ism"): pass
-            else: return
-        elif self.b[self.k - 1] == 't':
-            if self.ends("ate"): pass
-            elif self.ends("iti"): pass
-            else: return
-        elif self.b[self.k - 1] == 'u':
-            if self.ends("ous"): pass
-            else: return
-        elif self.b[self.k - 1] == 'v':
-            if self.ends("ive"): pass
-            else: return
-        elif self.b[self.k - 1] == 'z':
-            if self.ends("ize"): pass
-            else: return
-        else:
-            return
-        if self.m() > 1:
-            self.k = self.j
-
-    def step5(self):
-        """step5() removes a final -e if m() > 1, and changes -ll to -l if
-        m() > 1.
-        """
-        self.j = self.k
-        if self.b[self.k] == 'e':
-            a = self.m()
-            if a > 1 or (a == 1 and not self.cvc(self.k-1)):
-                self.k = self.k - 1
-        if self.b[self.k] == 'l' and self.doublec(self.k) and self.m() > 1:
-            self.k = self.k -1
-
-    def stem(self, p, i, j):
-        """In stem(p,i,j), p is a char pointer, and the string to be stemmed
-        is from p[i] to p[j] inclusive. Typically i is zero and j is the
-        offset to the last character of a string, (p[j+1] == '\0'). The
-        stemmer adjusts the characters p[i] ... p[j] and returns the new
-        end-point of the string, k. Stemming never increases word length, so
-        i <= k <= j. To turn the stemmer into a module, declare 'stem' as
-        extern, and delete the remainder of this file.
-        """
-        # copy the parameters into statics
-        self.b = p
-        self.k = j
-        self.k0 = i
-        if self.k <= self.k0 + 1:
-            return self.b # --DEPARTURE--
-
-        # With this line, strings of length 1 or 2 don't go through the
-        # stemming process, although no mention is made of this in the
-        # published algorithm. Remove the line to match the published
-        # algorithm.
-
-        self.step1ab()
-        self.step1c()
-        self.step2()
-        self.step3()
-        self.step4()
-        self.step5()
-        return self.b[self.k0:self.k+1]
+import time
+import argparse
+import multiprocessing
+import StringIO
+import compress
+import analysis
+from porter import PorterStemmer
+import indexfile
+import scoring
+import metrics
+
+stems = analysis.Stemmer(PorterStemmer()) #stems of the words already stemmed
 
 #===============================================================================
-#Main function
-if __name__ == '__main__':
-    dictionary = []
-    posting = []
-    #read dictionary file
-    dictionary = cPickle.load(open('dictionary.txt', 'rb'))
-    #read posting file
-    posting = cPickle.load(open('posting.txt', 'rb'))
-
-    #for p in range(len(dictionary)):
-        #print "Dictionary:",dictionary[p]," Posting:", posting[p]
-    print "Total Terms: ", len(dictionary)
-
-    infile = open("query.text","r")
+#Ranking and evaluation of a query
+#With -p the queries are ranked and evaluated in a pool of worker processes.
+#Every worker memory maps index.bin itself, so they all read the one copy of it
+#in the page cache, and the results are printed in query order.
+
+K = 10 #number of documents to retrieve
+
+def start(options):
+    """Memory map the index file and keep the command line options, in the main
+    process and in every worker process."""
+    global args, exhaustive, indexbin, dictionary, posting
+    args = options
+    exhaustive = args.exhaustive
+    #memory map the index file, terms and posting lists are read from it when used
+    indexbin = indexfile.load(args.index)
+    dictionary = indexfile.Dictionary(indexbin)
+    #compressed posting lists are decoded when first used
+    posting = compress.Postings(indexfile.Encoded(indexbin), positions=False)
+
+def evaluate(query):
+    """Rank the documents for query, [query number, query terms, accumulators
+    or None, relevant document IDs]. Return the output and the ranking, the
+    list of the document IDs retrieved, best first."""
+    qnum, queryterms, acc, relevant = query
+    out = StringIO.StringIO()
+    print >>out, "Doing DocID:", qnum
+
+    #=======================================================================
+    #find top K, rank the documents tier by tier
+    #the tiers of every term are in index.bin (invert.py -t sets the thresholds):
+    #Tier 1 docs with term freq 20+, Tier 2 docs with term freq 10-19 (default), and Tier 3
+    #the champion lists, the top 10 docs by tf*idf weight of the other docs
+    Tier1 = [] #final tier1 list
+    Tier2 = [] #final tier2 list
+    Tier3 = [] #final tier3 list
+    Rank = []
+    #find term in dictionary
+    links = [] #links of the query terms found in the dictionary, query order
+    for i in range(len(queryterms)): #for every query term
+        index = indexbin.find(queryterms[i]) #find the query term in dictionary
+        if index != -1:
+            #print "Query Term:", queryterms[i]," Document freqency: ", dictionary[index][1]
+            links.append(index)
+        else:
+            print >>out, "Query Term:", queryterms[i], " not found!"
+
+    print >>out, "Relevant DocIDs:", relevant
+
+    #=======================================================================
+    #Ranking Documents, create vectors, calculate similarity scores
+    scores = []
+
+    #-----------------------------------------------------------------------
+    #the scorer of the model (scoring.py) reads the posting lists of the
+    #query terms once, term at a time, when the first document is scored
+    scorer = scoring.MODELS[args.model](indexbin, posting, queryterms, acc)
+    #for link, count in scorer.terms: #for every query term in the dictionary
+        #print "dictionary term: ", dictionary[link][0], " Query term:", queryterms
+        #print "count of term in queryterms: ", count, "\n"
+    if exhaustive: #rank every document with a query term instead of the tiers
+        Rank = scorer.rank(max(K, len(relevant)))
+
+    #-----------------------------------------------------------------------
+    #calculate similarity score for every docID in Tier1
+    if not exhaustive:
+        Tier1 = scoring.tier(indexbin, links, 1) #read Tier1 of the query terms
+        #print "Tier 1: ", [indexbin.docid(doc) for doc in Tier1]
+    if len(Tier1) != 0: #if Tier1 is not empty
+        #print "Tier1 len =", len(Tier1)
+        for index in range(len(Tier1)): #for every docID in Tier1
+            #calculate the score of the document with the model
+            scores.append(scorer.score(Tier1[index]))
+        #print "Tier1 scores", scores
+        #-------------------------------------------------------------------
+        #Rank documents in Tier1
+        Rank.extend(scoring.top(Tier1, scores, K)) #store the top docIDs with scores into final ranking
+        #print "Rank with only Tier1:", Rank  #, "\n"
+
+    #=======================================================================
+    scores = [] #reset
+    #if less than K rank documents then use Tier2
+    if (len(Rank) < K) & (not exhaustive):
+        #calculate similarity score for every docID in Tier2
+        Tier2 = scoring.tier(indexbin, links, 2) #read Tier2 of the query terms only now
+        #print "Tier 2: ", [indexbin.docid(doc) for doc in Tier2]
+        if len(Tier2) != 0: #if Tier2 is not empty
+            #print "Tier2 len =", len(Tier2)
+            for index in range(len(Tier2)): #for every docID in Tier2
+                #calculate the score of the document with the model
+                scores.append(scorer.score(Tier2[index]))
+            #print "Tier2 scores", scores
+            #-------------------------------------------------------------------
+            #Rank documents in Tier2
+            Rank.extend(scoring.top(Tier2, scores, K - len(Rank))) #store the top docIDs with scores into final ranking
+            #print "Rank with Tier1 and Tier2:", Rank #, "\n"
+
+    #=======================================================================
+    scores = [] #reset
+    #if less than K rank documents then use Tier3
+    if (len(Rank) < K) & (not exhaustive):
+        #calculate similarity score for every docID in Tier3
+        Tier3 = scoring.champions(indexbin, posting, links, 10, args.full) #top 10 champions of the query terms
+        #print "Tier 3: ", [indexbin.docid(doc) for doc in Tier3]
+        if len(Tier3) != 0: #if Tier3 is not empty
+            #print "Tier3 len =", len(Tier3)
+            for index in range(len(Tier3)): #for every docID in Tier3
+                #calculate the score of the document with the model
+                scores.append(scorer.score(Tier3[index]))
+            #print "Tier3 scores", scores
+            #-------------------------------------------------------------------
+            #Rank documents in Tier3
+            #until Rank has as many documents as relevant
+            Rank.extend(scoring.top(Tier3, scores, len(relevant) - len(Rank))) #store the docIDs with scores into final ranking
+            print >>out, "Len Relevant:", len(relevant)
+            #print "Len Rank:", len(Rank)
+            #print "Rank with Tier1, Tier2 and Tier3:", Rank #, "\n"
+
+    #=======================================================================
+    #Sort Rank by highest scores
+    #doc numbers back to the document IDs of the collection
+    for index in range(len(Rank)):
+        Rank[index][0] = indexbin.docid(Rank[index][0])
+    #print "Before Rank sort:", Rank
+    Rank = sorted(Rank, key=lambda x: x[1], reverse=True) #sort highest to lowest
+    #print "After sort:", Rank
+    print >>out, "Top K Documents Ranked:", Rank
+    return out.getvalue(), [doc for doc, score in Rank]
+
+def readqueries(filename, stemming, stopword):
+    """Return [ [query number, query terms], ... ] the queries of filename,
+    stemmed if stemming is "y" and without stopwords if stopword is "y", the
+    options of the index."""
+    infile = open(filename,"r")
     line = infile.readline().replace('\n', '')
-    edited = ""
-    edited = line.translate(None,string.punctuation)
     #count = 0
     qnum = 1 #counter for query number
-
-    precision = []
-    map = []
-    MAP = [] #average MAP over all queries
-    rprecision = 0
-    Rprecision = [] #average R-Precision over all queries
+    queries = [] #[ [query number, query terms], ... ] of query.text
+    p = None
+    if stemming == "y":
+        p = stems
+    stopwords = frozenset()
+    if stopword == "y":
+        stopwords = analysis.stopwords()
+    analyzer = analysis.chain(p, stopwords)
 
     while 1:
-        edited = ""
         term = ""
-        output = ""
         queryterms = []
-        precision = []
-        map = []
-        rprecision = 0
         if (".N" in line.split()) | (".I" in line.split()) | (line == ''):
             while 1:
                 if (".W" in line.split()) | (".I 0" in line):
@@ -394,578 +174,92 @@ if __name__ == '__main__':
         if ".W" in line.split(): #if found query text
             line = infile.readline().replace('\n', '')
             #count = count+1
-            print "Doing DocID:", qnum
             qnum = qnum+1
             while 1:
                 if (".I" in line.split()) | (".W" in line.split()) | (".N" in line.split()) | (line == ''):
                     break
                 else:
-                    edited = line.translate(None,string.punctuation)
-                    term = term+edited+" "
+                    term = term+line+" " #punctuation is removed by the analyzer chain
                     line = infile.readline().replace('\n', '') #next line
             #print "term:", term
 
             #===================================================================
-            #Optional Stemming
-            #print "count:", count
-            output = term.split()
-            #print output
-
-            #stemming = raw_input("Apply stemming? (y/n): ");
-            stemming = "y" #default setting <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<< MANUALLY CHANGE SETTING
-            if stemming == "y":
-                p = PorterStemmer()
-                output = ''
-                word = ''
-                for c in term:
-                    if c.isalpha():
-                        word += c.lower()
-                        #print "word", word
-                    else:
-                        if word:
-                            #print "if word", word
-                            output += p.stem(word, 0,len(word)-1)
-                            word = ''
-                        output += c.lower()
-                output += p.stem(word, 0,len(word)-1)
-                #print "Stemming applied: ", output
-                output = output.split();
-                #print "output split:", output
-
-            #=======================================================================
-            #Optional Stopwords Removal
-            #stopword = raw_input("Remove stopwords? (y/n): ");
-            stopword = "y" #default setting <<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<< MANUALLY CHANGE SETTING
-            if stopword == "y":
-                for index in range(len(output)): #for all the terms user inputed, check if it is a stopword
-                    stwds = open("common_words","r")
-                    count = 0 #reset counter, 0 means not a stopword, 1 means is a stopword
-                    while 1: #for every stopword, check if query term matches a stopword
-                        line = stwds.readline().replace('\n', '') #remove the "\n" newline at the end when reading
-                        if line == "":
-                            stwds.close()
-                            break
-                        if line == output[index]: #if it is a stopword
-                            count =  1
-                    if count == 0: #if it was not a stopword
-                        queryterms.append(output[index]) #put into query terms
-                #print "query terms for only stopwords and stemming+no stopwords ", queryterms
-
-            #=======================================================================
-            #Query Terms extraction
-            #if no stemming and with stopwords
-            if (stemming == "n") & (stopword == "n"):
-                queryterms = output
-                #print "n n", queryterms
-            #if only stemming
-            if (stemming == "y") & (stopword == "n"):
-                queryterms = output
-            #if stemming and stopwords removed = by default queryterms already made
-            #if only stopwords = by default queryterms already made
-            #print "Query Terms: ", queryterms, "\n"
-
-            #=======================================================================
-            #find top K = 10, separate into 3 Tiers
-            #for each term entered, find term in dictionary
-            #tier1 = [] #threshold = 20+ posting          [docIDs for term1]
-            Tier1 = [] #final tier1 list              [ [docIDs for term1] , [docIDs for term2 ]
-            #tier2 = [] #threshold = 10-19 posting
-            Tier2 = [] #final tier2 list
-            tier3 = [] #threshold = 1-9
-            Tier3 = [] #final tier3 list
-            Rank = []
-            #find term in dictionary
-            found = 0
-            #count1 = 0 #counter for tier1 index
-            #count2 = 0 #counter for tier2 index
-            for i in range(len(queryterms)): #for every query term
-                found = 0 #reset
-                #tier1 = [] #reset
-                #tier2 = [] #reset
-                tier3 = [] #reset
-                for index in range(len(dictionary)): #for every term in dictionary find query term
-                    #print "Query term = ", queryterms[i], " Dictionary Term = ", dictionary[index][0]
-                    if queryterms[i] == dictionary[index][0]: #find the query term in dictionary
-                        #print "YES+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++"
-                        #print "Query Term:", queryterms[i]," Document freqency: ", dictionary[index][1]
-                        found = 1
-                        #Tiered Index: separate term postings into Tier 1 array with doc#: term freq = 20+, Tier 2 array with doc#: term freq = 10-19
-                        spot = dictionary[index][2] #index in posting of that term
-                        for x in range(dictionary[index][1]): #for every docID in posting list (the doc freq in dictionary), seperate into tiers
-                            #if doc has term freq > 20+ then place into Tier 1
-                            #print "posting term freq of doc: ", posting[spot][1][x]
-                            if posting[spot][1][x] >= 20:
-                                if posting[spot][0][x] not in Tier1: #if docID is not in Tier1 list then add it
-                                    #tier1.append(posting[spot][0][x]) #append docID
-                                    Tier1.append(posting[spot][0][x])
-                            #if doc has term freq 10-19 then place into Tier 2
-                            if (posting[spot][1][x] >= 10) & (posting[spot][1][x] < 20):
-                                if posting[spot][0][x] not in Tier2: #if docID is not in Tier2 then add it
-                                    #tier2.append(posting[spot][0][x]) #append docID
-                                    Tier2.append(posting[spot][0][x])
-                            #if doc has term freq 1-9 then place into Tier 3
-                            if (posting[spot][1][x] > 0) & (posting[spot][1][x] < 10):
-                                if posting[spot][0][x] not in Tier3: #if docID is not in Tier3 then add it to tier3
-                                    tier3.append(posting[spot][0][x]) #append docID
-                                    #Tier3.append(posting[spot][0][x])
-                        #=============================================================== ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                        #keep the top 10 document in tier3 with highest tf*idf weight from dvector to calculate score
-                        #create idf vector, idf = log (N / df)
-                        idf = []
-                        N = len(dictionary)+0.0
-                        #print "N =", N
-                        #for a in range(len(dictionary)):
-                            #print "doc freq", dictionary[index][1]
-                        idf.append(round(math.log10(N/dictionary[index][1]),2)) #calculate that one term's idf
-                        #print "idf:", idf
-                        #-----------------------------------------------------------
-                        #find the top 10 highest weight in dvector
-                        temp = [] #store the top 10 highest weight tf*idf
-                        #match = 0
-                        dvector = []
-                        for o in range(len(tier3)): #for every docID in tier3
-                            tf = []
-                            #dvector = []
-                            #create tf vector
-                            #for y in range(len(dictionary)):
-                            for a in range(len(posting[spot][1])): #for every docID in posting of every term
-                                if posting[spot][0][a] == tier3[o]:  #if posting docID matches tier3 docID, then calculate the tf
-                                        #match = 1
-                                        #print "posting ", posting[y][1][a]
-                                        #print "Tf append =", round(math.log10(posting[y][1][a]),2) + 1
-                                    tf.append(round(math.log10(posting[spot][1][a]),2) + 1) #tf = log (term freq) + 1
-                                        #break?
-                                #if match == 0: #if is no match then record as 0 for term freq
-                                    #tf.append(0)
-                                #match = 0 #reset
-                            #print "tf ", tf
-                            #print "len tf=",len(tf)
-                            #print "len idf=", len(idf)
-
-                            #---------------------------------------------------------------
-                            #create document vector tf*idf
-                            #for d in range(len(tf)):
-                                #print "tf =", tf[d], " idf", idf[d]
-                                #print "dvector append=", round(tf[d]*idf[d],2)
-                            dvector.append(round(tf[0]*idf[0],2)) #calculate only that term's tf*idf weight
-                        #print dvector
-                        #print len(tier3)
-                        #print len(dvector)
-
-                        #---------------------------------------------------------------
-                        #find highest weight
-                        temp = [] #reset
-                        for e in range(len(dvector)):
-                            highest = 0 #reset
-                            pos = 0 #reset
-                            if len(temp) == 10: #if temp has top 10 highest weight then stop
-                                break
-                            for m in range(len(dvector)):
-                                if dvector[m] > highest:
-                                    highest = dvector[m]
-                                    pos = m
-                            #print "highest:", dvector[pos]
-                            temp.append(tier3[pos]) #store the docID
-                            dvector[pos] = 0 #change highest score in scores to 0 so we dont use it again
-                        #print "temp:", temp
-                        #store the top 10 highest weight docID into final Tier3 list
-                        for k in range(len(temp)):
-                            Tier3.append(temp[k])
-
-                if found == 0:
-                    print "Query Term:", queryterms[i], " not found!"
-                #place tier1 into final Tier1 list
-                #Tier1.append(tier1)
-                #print "Tier 1: ", Tier1
-                #place tier2 into final Tier2 list
-                #Tier2.append(tier2)
-                #print "Tier 2: ", Tier2
-                #place tier3 into final Tier3 list
-                #Tier3.append(tier3)
-                #print "Tier 3: ", Tier3, "\n"
-
-            #=======================================================================
-            #Ranking Documents, create vectors, calculate similarity scores
-            tf = []
-            idf = []
-            dvector = [] #document vector
-            qvector = [] #query vector
-            ndvector = 0 #normalized document vector
-            nqvector = 0 #normalized query vector
-            dotproduct = 0
-            scores = []
-            match = 0
-            N = 0
-
-            #-----------------------------------------------------------------------
-            #create idf vector, idf = log (N / df)
-            N = len(dictionary)
-            #print "N =", N
-            for index in range(len(dictionary)):
-                #print "doc freq", dictionary[index][1]
-                idf.append(round(math.log10(N/dictionary[index][1]),2))
-            #print "idf:", idf
-
-            #-----------------------------------------------------------------------
-            #create query vector and noramlized vector
-            for index in range(len(dictionary)): #for every term in the dictionary
-                if dictionary[index][0] in queryterms: #if dictionary term is one of the query term
-                    #print "dictionary term: ", dictionary[index][0], " Query term:", queryterms
-                    #store the term freq in queryterm in the tf vector
-                    #print "count of term in queryterms: ", queryterms.count(dictionary[index][0]), "\n"
-                    tf.append(round(math.log10(queryterms.count(dictionary[index][0])) + 1, 2)) #tf = log (term freq) + 1
-                    #print tf
-                else:
-                    #not in query term then add a 0 in tf vector
-                    tf.append(0)
-            #print "query tf = ", tf
-            #print "len tf=",len(tf)
-            #print "len idf=", len(idf)
-            #-----------------------------------------------------------------------
-            #create query vector
-            for d in range(len(tf)):
-                #print "query tf =", tf[d], " idf", idf[d]
-                #print "qvector append=", round(tf[d]*idf[d],2)
-                qvector.append(round(tf[d]*idf[d],2))
-            #print "qvector ", qvector
-            #-----------------------------------------------------------------------
-            #create normalized query vector
-            #print "len qvector= ", len(qvector)
-            for b in range(len(qvector)):
-                nqvector = nqvector + qvector[b]*qvector[b]  #adding the square of each term freq
-            #print "nqvector before sqrt=", nqvector
-            nqvector = round(math.sqrt(nqvector),2)
-            #print "nqvector=", nqvector
-
-            #-----------------------------------------------------------------------
-            #create document vector, normalized vector and calculate similarity score for every docID in Tier1
-            if len(Tier1) != 0: #if Tier1 is not empty
-                #print "Tier1 len =", len(Tier1)
-                for index in range(len(Tier1)): #for every docID in Tier1
-                    tf = [] #reset
-                    dvector = [] #reset
-                    ndvector = 0 #reset
-                    dotproduct = 0
-                    #create tf vector
-                    for y in range(len(dictionary)): #for every term in dictionary, find docID and record the term freq
-                        for a in range(len(posting[y][1])): #for every docID in posting of every term
-                            if posting[y][0][a] == Tier1[index]:  #if posting docID matches Tier1 docID, then calculate the tf
-                                match = 1
-                                #print "posting ", posting[y][1][a]
-                                #print "Tf append =", round(math.log10(posting[y][1][a]),2) + 1
-                                tf.append(round(math.log10(posting[y][1][a]),2) + 1) #tf = log (term freq) + 1
-                                #break?
-                        if match == 0: #if is no match then record as 0 for term freq
-                            tf.append(0)
-                        match = 0 #reset
-                    #print "tf ", tf
-                    #print "len tf=",len(tf)
-                    #print "len idf=", len(idf)
-                    #---------------------------------------------------------------
-                    #create document vector tf*idf
-                    for d in range(len(tf)):
-                        #print "tf =", tf[d], " idf", idf[d]
-                        #print "dvector append=", round(tf[d]*idf[d],2)
-                        dvector.append(round(tf[d]*idf[d],2))
-                    #print "dvector ", dvector
-                    #---------------------------------------------------------------
-                    #calculate the normalized document vector
-                    #print "len dvector= ", len(dvector)
-                    for b in range(len(dvector)):
-                        ndvector = ndvector + dvector[b]*dvector[b]  #adding the square of each term freq
-                    #print "ndvector before sqrt=", ndvector
-                    ndvector = round(math.sqrt(ndvector),2)
-                    #print "ndvector=", ndvector
-                    #---------------------------------------------------------------
-                    #calculate the dot product of d . q
-                    for c in range(len(qvector)):
-                        dotproduct = dotproduct + qvector[c]*dvector[c]
-                    #---------------------------------------------------------------
-                    #calculate the similarity score (d,q) = d . q / |d| . |q|
-                    scores.append(round(dotproduct/(ndvector*nqvector),2))
-                #print "Tier1 scores", scores
-                #-------------------------------------------------------------------
-                #Rank documents in Tier1
-                highest = 0
-                pos = 0
-                if len(scores) >= 10: #if more than 10 scores
-                    for e in range(1,11): #choose top 10 highest scores #(1, 10) = 1, ... , 9 and not 1, ... , 10
-                        highest = 0 #reset
-                        pos = 0 #reset
-                        for index in range(len(scores)): #for every scores
-                            if scores[index] > highest:
-                                highest = scores[index]
-                                pos = index
-                        Rank.append([Tier1[pos],highest]) #store the docID with score
-                        scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-                else: #if less than 10 result
-                    for e in range(len(scores)):
-                        highest = 0 #reset
-                        pos = 0 #reset
-                        for index in range(len(scores)):
-                            if scores[index] > highest:
-                                highest = scores[index]
-                                pos = index
-                        Rank.append([Tier1[pos],highest]) #store the docID with score into final ranking
-                        scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-                #print "Rank with only Tier1:", Rank  #, "\n"
-
-            #=======================================================================
-            scores = [] #reset
-            match = 0 #reset
-            #if less than K=10 rank documents then use Tier2
-            if len(Rank) < 10:
-                #create document vector, normalized vector and calculate similarity score for every docID in Tier2
-                if len(Tier2) != 0: #if Tier2 is not empty
-                    #print "Tier2 len =", len(Tier2)
-                    for index in range(len(Tier2)): #for every docID in Tier2
-                        tf = [] #reset
-                        dvector = [] #reset
-                        ndvector = 0 #reset
-                        dotproduct = 0
-                        #create tf vector
-                        for y in range(len(dictionary)): #for every term in dictionary, find docID and record the term freq
-                            for a in range(len(posting[y][1])): #for every docID in posting of every term
-                                if posting[y][0][a] == Tier2[index]:  #if posting docID matches Tier2 docID, then calculate the tf
-                                    match = 1
-                                    #print "posting ", posting[y][1][a]
-                                    #print "Tf append =", round(math.log10(posting[y][1][a]),2) + 1
-                                    tf.append(round(math.log10(posting[y][1][a]),2) + 1) #tf = log (term freq) + 1 ++++++++++++++++++++++++++++++++fixed?
-                                    #break?
-                            if match == 0: #if is no match then record as 0 for term freq
-                                tf.append(0)
-                            match = 0 #reset
-                        #print "tf ", tf
-                        #print "len tf=",len(tf)
-                        #print "len idf=", len(idf)
-                        #---------------------------------------------------------------
-                        #create document vector tf*idf
-                        for d in range(len(tf)):
-                            #print "tf =", tf[d], " idf", idf[d]
-                            #print "dvector append=", round(tf[d]*idf[d],2)
-                            dvector.append(round(tf[d]*idf[d],2))
-                        #print "dvector ", dvector
-                        #---------------------------------------------------------------
-                        #calculate the normalized document vector
-                        #print "len dvector= ", len(dvector)
-                        for b in range(len(dvector)):
-                            ndvector = ndvector + dvector[b]*dvector[b]  #adding the square of each term freq
-                        #print "ndvector before sqrt=", ndvector
-                        ndvector = round(math.sqrt(ndvector),2)
-                        #print "ndvector=", ndvector
-                        #---------------------------------------------------------------
-                        #calculate the dot product of d . q
-                        for c in range(len(qvector)):
-                            dotproduct = dotproduct + qvector[c]*dvector[c]
-                        #---------------------------------------------------------------
-                        #calculate the similarity score (d,q) = d . q / |d| . |q|
-                        scores.append(round(dotproduct/(ndvector*nqvector),2))
-                    #print "Tier2 scores", scores
-                    #-------------------------------------------------------------------
-                    #Rank documents in Tier2
-                    highest = 0
-                    pos = 0
-        ##            if len(scores) >= 10: #if more than 10 scores
-        ##                for e in range(1, 11): #choose top 10 highest scores #(1, 10) = 1, ... , 9 and not 1, ... , 10
-        ##                    highest = 0 #reset
-        ##                    pos = 0 #reset
-        ##                    for index in range(len(scores)): #for every scores
-        ##                        if scores[index] > highest:
-        ##                            highest = scores[index]
-        ##                            pos = index
-        ##                    Rank.append([Tier2[pos],highest]) #store the docID with score
-        ##                    scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-        ##            else: #if less than 10 result
-                    for e in range(len(scores)):
-                        highest = 0 #reset
-                        pos = 0 #reset
-                        if len(Rank) == 10: #if Rank has top 10 documents then stop
-                            break
-                        for index in range(len(scores)):
-                            if scores[index] > highest:
-                                highest = scores[index]
-                                pos = index
-                        Rank.append([Tier2[pos],highest]) #store the docID with score into final ranking
-                        scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-                    #print "Rank with Tier1 and Tier2:", Rank #, "\n"
-
-            #=======================================================================
-            scores = [] #reset
-            match = 0 #reset
-            #if less than K=10 rank documents then use Tier3
-            if len(Rank) < 10:
-                #create document vector, normalized vector and calculate similarity score for every docID in Tier3
-                if len(Tier3) != 0: #if Tier3 is not empty
-                    #print "Tier3 len =", len(Tier3)
-                    for index in range(len(Tier3)): #for every docID in Tier3
-                        tf = [] #reset
-                        dvector = [] #reset
-                        ndvector = 0 #reset
-                        dotproduct = 0
-                        #create tf vector
-                        for y in range(len(dictionary)): #for every term in dictionary, find docID and record the term freq
-                            for a in range(len(posting[y][1])): #for every docID in posting of every term
-                                if posting[y][0][a] == Tier3[index]:  #if posting docID matches Tier3 docID, then calculate the tf
-                                    match = 1
-                                    #print "posting ", posting[y][1][a]
-                                    #print "Tf append =", round(math.log10(posting[y][1][a]),2) + 1
-                                    tf.append(round(math.log10(posting[y][1][a]),2) + 1) #tf = log (term freq) + 1 ++++++++++++++++++++++++++++++++fixed?
-                                    #break?
-                            if match == 0: #if is no match then record as 0 for term freq
-                                tf.append(0)
-                            match = 0 #reset
-                        #print "tf ", tf
-                        #print "len tf=",len(tf)
-                        #print "len idf=", len(idf)
-                        #---------------------------------------------------------------
-                        #create document vector tf*idf
-                        for d in range(len(tf)):
-                            #print "tf =", tf[d], " idf", idf[d]
-                            #print "dvector append=", round(tf[d]*idf[d],2)
-                            dvector.append(round(tf[d]*idf[d],2))
-                        #print "dvector ", dvector
-                        #---------------------------------------------------------------
-                        #calculate the normalized document vector
-                        #print "len dvector= ", len(dvector)
-                        for b in range(len(dvector)):
-                            ndvector = ndvector + dvector[b]*dvector[b]  #adding the square of each term freq
-                        #print "ndvector before sqrt=", ndvector
-                        ndvector = round(math.sqrt(ndvector),2)
-                        #print "ndvector=", ndvector
-                        #---------------------------------------------------------------
-                        #calculate the dot product of d . q
-                        for c in range(len(qvector)):
-                            dotproduct = dotproduct + qvector[c]*dvector[c]
-                        #---------------------------------------------------------------
-                        #calculate the similarity score (d,q) = d . q / |d| . |q|
-                        scores.append(round(dotproduct/(ndvector*nqvector),2))
-                    #print "Tier3 scores", scores
-                    #-------------------------------------------------------------------
-                    #Rank documents in Tier3
-                    highest = 0
-                    pos = 0
-        ##            if len(scores) >= 10: #if more than 10 scores
-        ##                for e in range(1, 11): #choose top 10 highest scores #(1, 10) = 1, ... , 9 and not 1, ... , 10
-        ##                    highest = 0 #reset
-        ##                    pos = 0 #reset
-        ##                    for index in range(len(scores)): #for every scores
-        ##                        if scores[index] > highest:
-        ##                            highest = scores[index]
-        ##                            pos = index
-        ##                    Rank.append([Tier2[pos],highest]) #store the docID with score
-        ##                    scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-        ##            else: #if less than 10 result
-                    #-----------------------------------------------------------
-                    #store the list of relevant docID into relevant[]
-                    relevant = []
-                    nozero = ""
-                    filein = open("qrels.text","r")
-                    #store the list of relevant docID into relevant[]
-                    while 1:
-                        rline = filein.readline()
-                        editstr = rline.split()
-                        if rline == "":
-                            break
-                        if int(editstr[0]) == qnum-1: #qnum was increased at the top for next iteration so have to -1 here
-                            if editstr[1].startswith("0"): #if the docID starts with a 0 like "0950" then remove the 0 in the front
-                                nozero = ""
-                                nozero = editstr[1].lstrip("0") #remove leading 0s
-                                relevant.append(nozero)
-                            else:
-                                relevant.append(editstr[1])
-                    filein.close()
-                    print "Relevant DocIDs:", relevant
-                    #-----------------------------------------------------------
-                    for e in range(len(scores)):
-                        highest = 0 #reset
-                        pos = 0 #reset
-                        #if len(Rank) == 10: #if Rank has top 10 documents then stop
-                        if len(Rank) >= len(relevant):
-                            break
-                        for index in range(len(scores)):
-                            if scores[index] > highest:
-                                highest = scores[index]
-                                pos = index
-                        Rank.append([Tier3[pos],highest]) #store the docID with score into final ranking
-                        scores[pos] = 0 #change highest score in scores to 0 so we dont use it again
-                    print "Len Relevant:", len(relevant)
-                    #print "Len Rank:", len(Rank)
-                    #print "Rank with Tier1, Tier2 and Tier3:", Rank #, "\n"
-
-            #=======================================================================
-            #Sort Rank by highest scores
-            #print "Before Rank sort:", Rank
-            Rank = sorted(Rank, key=lambda x: x[1], reverse=True) #sort highest to lowest
-            #print "After sort:", Rank
-            print "Top K Documents Ranked:", Rank
-            #=======================================================================
-            #compare the results with the actual user judgment from qrels.text
-            #calculate precision for each documents in Rank that is in relevant documents
-            #relevant = []
-            rels = 0 #counter for relevant docs in Rank docs
-            p = 0
-            sum = 0
-##            infile = open("qrels.text","r")
-##            #store the list of relevant docID into relevant[]
-##            while 1:
-##                line = infile.readline()
-##                edited = line.split()
-##                if line == "":
-##                    break
-##                if int(edited[0]) == qnum:
-##                    relevant.append(edited[1])
-##            infile.close()
-##            print "relevant:", relevant
-            #-----------------------------------------------------------------------
-            #calculate precision of each relevant doc in Rank, # of relevant item retrieved / total # of items retrieved
-            for index in range(len(Rank)): #for every rank documents
-                if Rank[index][0] in relevant: #if rank doc is in relevant docs
-                    rels = rels + 1 #increase relevant doc counter
-                    #calculate the precision for doc in Rank
-                    p = round(rels/(index+1.0), 2)
-                    precision.append(p) #store precision of relevant doc in rank
-            print "precision:", precision
-            #-----------------------------------------------------------------------
-            #calculate MAP = sum of precision of relevant doc in Rank / total relevant docs
-            for i in range(len(precision)):
-                sum = sum + precision[i] + 0.0
-            if len(relevant) == 0:
-                MAP.append(0)
-            else:
-                map = round(sum/len(relevant), 2)
-                MAP.append(map)
-            print "MAP:", MAP
-            #-----------------------------------------------------------------------
-            #calculate R-Precision, r / |R|, precision at |R| / total relevant docs
-            rels = 0
-            #print "Len relevant=", len(relevant)
-            for j in range(len(Rank)):
-                if Rank[j][0] in relevant: #if rank doc is in relevant docs
-                    rels = rels + 1 #increase relevant doc counter
-                if j+1 == len(relevant):
-                    #calculate the precision at |R| in Rank
-                    if len(relevant) == 0:
-                        rprecision = 0
-                    else:
-                        rprecision = round(rels/(len(relevant)+0.0), 2)
-                    break
-            Rprecision.append(rprecision) #store r-precision value
-            print "R-Precision:", Rprecision, "\n"
+            #Query Terms extraction, same tokens, stemming and stopwords removal as the documents
+            queryterms = analyzer.analyze(term)
+
+            queries.append([qnum-1, queryterms]) #qnum was increased at the top for the next query
+    infile.close()
+    return queries
+
+#===============================================================================
+#Main function
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rank the queries of query.text with index.bin and evaluate them with qrels.text")
+    parser.add_argument("-x", "--exhaustive", action="store_true", help="rank every document with a query term instead of the tiers (MaxScore with cosine)")
+    parser.add_argument("-m", "--model", choices=sorted(scoring.MODELS), default="cosine", help="scoring model, cosine tf-idf (default), BM25 or query likelihood (ql)")
+    parser.add_argument("-b", "--batch", action="store_true", help="score all the queries at once with the term-document matrix (cosine only)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of worker processes, 0 for one per core (default 1)")
+    parser.add_argument("-i", "--index", default="index.bin", metavar="FILE", help="index file (default index.bin)")
+    parser.add_argument("-f", "--full", action="store_true", help="find Tier 3 in the posting list of a term when its champion list in index.bin is too short")
+    args = parser.parse_args()
+    if args.batch & (args.model != "cosine"):
+        parser.error("-b only works with -m cosine")
+    processes = args.processes
+    if processes == 0:
+        processes = multiprocessing.cpu_count()
+    start(args)
+
+    #for p in range(len(dictionary)):
+        #print "Dictionary:",dictionary[p]," Posting:", posting[p]
+    print "Total Terms: ", len(dictionary)
+
+    #the queries of query.text, with the stemming and stopwords options of the index
+    queries = readqueries("query.text", indexbin.stemming, indexbin.stopword)
 
     #===========================================================================
-    #calculate average MAP values over all queries
-    avgMAP = 0.0
-    for index in range(len(MAP)):
-        avgMAP = avgMAP + MAP[index]
-    print "Final average MAP values over all queries:", round(avgMAP/len(MAP),2)
-    #---------------------------------------------------------------------------
-    #calculate average R-Precision values over all queries
-    avgRP = 0.0
-    for index in range(len(Rprecision)):
-        avgRP = avgRP + Rprecision[index]
-    print "Final average R-Precision values over all queries:", round(avgRP/len(Rprecision),2)
+    #rank and evaluate every query
+    #with -b the accumulators of all the queries are computed first, with one
+    #pass over the rows of the term-document matrix they need (scoring.product)
+    accumulators = [None]*len(queries)
+    if args.batch:
+        accumulators = scoring.product(indexbin, [scoring.query(indexbin, queryterms) for qnum, queryterms in queries])
+
+    #the relevant documents of every query, qrels.text is read once
+    qrels = metrics.qrels("qrels.text")
+    relevants = [qrels.get(qnum, []) for qnum, queryterms in queries]
+
+    jobs = [[queries[i][0], queries[i][1], accumulators[i], relevants[i]] for i in range(len(queries))]
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, start, (args,))
+        results = pool.imap(evaluate, jobs) #in query order
+    else:
+        results = (evaluate(job) for job in jobs)
+    outputs = []
+    rankings = []
+    for output, ranking in results:
+        outputs.append(output)
+        rankings.append(ranking)
+    if processes > 1:
+        pool.close()
+        pool.join()
 
-    infile.close()
+    #===========================================================================
+    #compare the rankings with the actual user judgment from qrels.text
+    #MAP, R-Precision, P@K, Recall@K and nDCG@K of every query (metrics.py)
+    values = metrics.table(rankings, relevants, K)
+    for i in range(len(queries)):
+        sys.stdout.write(outputs[i])
+        print "precision:", metrics.precisions(rankings[i], relevants[i])
+        print "MAP:", values["MAP"][:i+1]
+        print "R-Precision:", values["R-Precision"][:i+1], "\n"
+
+    #===========================================================================
+    #calculate average values over all queries
+    print "Final average MAP values over all queries:", metrics.mean(values["MAP"])
+    print "Final average R-Precision values over all queries:", metrics.mean(values["R-Precision"])
+    print "Final average P@%d values over all queries:" % K, metrics.mean(values["P"])
+    print "Final average Recall@%d values over all queries:" % K, metrics.mean(values["Recall"])
+    print "Final average nDCG@%d values over all queries:" % K, metrics.mean(values["nDCG"])
 
 
 
@@ -1,884 +1,342 @@
 #!/usr/bin/env python
-import string
-import cPickle
+import os
+import argparse
+import multiprocessing
 from operator import itemgetter
+import cacm
+import analysis
+from porter import PorterStemmer
+import indexfile
+import tokenfile
 
-"""Porter Stemming Algorithm
-This is the Porter stemming algorithm, ported to Python from the
-version coded up in ANSI C by the author. It may be be regarded
-as canonical, in that it follows the algorithm presented in
+#stems of the words already stemmed by this process, worker processes start
+#with a copy of it
+stems = analysis.Stemmer(PorterStemmer())
 
-Porter, 1980, An algorithm for suffix stripping, Program, Vol. 14,
-no. 3, pp 130-137,
-
-only differing from it at the points maked --DEPARTURE-- below.
-
-See also http://www.tartarus.org/~martin/PorterStemmer
-
-The algorithm as described in the paper could be exactly replicated
-by adjusting the points of DEPARTURE, but this is barely necessary,
-because (a) the points of DEPARTURE are definitely improvements, and
-(b) no encoding of the Porter stemmer I have seen is anything like
-as exact as this version, even with the points of DEPARTURE!
-
-Vivake Gupta (v@nano.com)
-
-Release 1: January 2001
-
-Further adjustments by Santiago Bruno (bananabruno@gmail.com)
-to allow word input not restricted to one word per line, leading
-to:
-
-release 2: July 2008
-"""
-
-import sys
-
-class PorterStemmer:
-
-    def __init__(self):
-        """The main part of the stemming algorithm starts here.
-        b is a buffer holding a word to be stemmed. The letters are in b[k0],
-        b[k0+1] ... ending at b[k]. In fact k0 = 0 in this demo program. k is
-        readjusted downwards as the stemming progresses. Zero termination is
-        not in fact used in the algorithm.
-
-        Note that only lower case sequences are stemmed. Forcing to lower case
-        should be done before stem(...) is called.
-        """
-
-        self.b = ""  # buffer for word to be stemmed
-        self.k = 0
-        self.k0 = 0
-        self.j = 0   # j is a general offset into the string
-
-    def cons(self, i):
-        """cons(i) is TRUE <=> b[i] is a consonant."""
-        if self.b[i] == 'a' or self.b[i] == 'e' or self.b[i] == 'i' or self.b[i] == 'o' or self.b[i] == 'u':
-            return 0
-        if self.b[i] == 'y':
-            if i == self.k0:
-                return 1
-            else:
-                return (not self.cons(i - 1))
-        return 1
-
-    def m(self):
-        """m() measures the number of consonant sequences between k0 and j.
-        if c is a consonant sequence and v a vowel sequence, and <..>
-        indicates arbitrary presence,
-
-           <c><v>       gives 0
-           <c>vc<v>     gives 1
-           <c>vcvc<v>   gives 2
-           <c>vcvcvc<v> gives 3
-           ....
-        """
-        n = 0
-        i = self.k0
-        while 1:
-            if i > self.j:
-                return n
-            if not self.cons(i):
-                break
-            i = i + 1
-        i = i + 1
-        while 1:
-            while 1:
-                if i > self.j:
-                    return n
-                if self.cons(i):
-                    break
-                i = i + 1
-            i = i + 1
-            n = n + 1
-            while 1:
-                if i > self.j:
-                    return n
-                if not self.cons(i):
-                    break
-                i = i + 1
-            i = i + 1
-
-    def vowelinstem(self):
-        """vowelinstem() is TRUE <=> k0,...j contains a vowel"""
-        for i in range(self.k0, self.j + 1):
-            if not self.cons(i):
-                return 1
-        return 0
-
-    def doublec(self, j):
-        """doublec(j) is TRUE <=> j,(j-1) contain a double consonant."""
-        if j < (self.k0 + 1):
-            return 0
-        if (self.b[j] != self.b[j-1]):
-            return 0
-        return self.cons(j)
-
-    def cvc(self, i):
-        """cvc(i) is TRUE <=> i-2,i-1,i has the form consonant - vowel - consonant
-        and also if the second c is not w,x or y. this is used when trying to
-        restore an e at the end of a short  e.g.
-
-           cav(e), lov(e), hop(e), crim(e), but
-           snow, box, tray.
-        """
-        if i < (self.k0 + 2) or not self.cons(i) or self.cons(i-1) or not self.cons(i-2):
-            return 0
-        ch = self.b[i]
-        if ch == 'w' or ch == 'x' or ch == 'y':
-            return 0
-        return 1
-
-    def ends(self, s):
-        """ends(s) is TRUE <=> k0,...k ends with the string s."""
-        length = len(s)
-        if s[length - 1] != self.b[self.k]: # tiny speed-up
-            return 0
-        if length > (self.k - self.k0 + 1):
-            return 0
-        if self.b[self.k-length+1:self.k+1] != s:
-            return 0
-        self.j = self.k - length
-        return 1
-
-    def setto(self, s):
-        """setto(s) sets (j+1),...k to the characters in the string s, readjusting k."""
-        length = len(s)
-        self.b = self.b[:self.j+1] + s + self.b[self.j+length+1:]
-        self.k = self.j + length
-
-    def r(self, s):
-        """r(s) is used further down."""
-        if self.m() > 0:
-            self.setto(s)
-
-    def step1ab(self):
-        """step1ab() gets rid of plurals and -ed or -ing. e.g.
-
-           caresses  ->  caress
-           ponies    ->  poni
-           ties      ->  ti
-           caress    ->  caress
-           cats      ->  cat
-
-           feed      ->  feed
-           agreed    ->  agree
-           disabled  ->  disable
-
-           matting   ->  mat
-           mating    ->  mate
-           meeting   ->  meet
-           milling   ->  mill
-           messing   ->  mess
-
-           meetings  ->  meet
-        """
-        if self.b[self.k] == 's':
-            if self.ends("sses"):
-                self.k = self.k - 2
-            elif self.ends("ies"):
-                self.setto("i")
-            elif self.b[self.k - 1] != 's':
-                self.k = self.k - 1
-        if self.ends("eed"):
-            if self.m() > 0:
-                self.k = self.k - 1
-        elif (self.ends("ed") or self.ends("ing")) and self.vowelinstem():
-            self.k = self.j
-            if self.ends("at"):   self.setto("ate")
-            elif self.ends("bl"): self.setto("ble")
-            elif self.ends("iz"): self.setto("ize")
-            elif self.doublec(self.k):
-                self.k = self.k - 1
-                ch = self.b[self.k]
-                if ch == 'l' or ch == 's' or ch == 'z':
-                    self.k = self.k + 1
-            elif (self.m() == 1 and self.cvc(self.k)):
-                self.setto("e")
-
-    def step1c(self):
-        """step1c() turns terminal y to i when there is another vowel in the stem."""
-        if (self.ends("y") and self.vowelinstem()):
-            self.b = self.b[:self.k] + 'i' + self.b[self.k+1:]
-
-    def step2(self):
-        """step2() maps double suffices to single ones.
-        so -ization ( = -ize plus -ation) maps to -ize etc. note that the
-        string before the suffix must give m() > 0.
-        """
-        if self.b[self.k - 1] == 'a':
-            if self.ends("ational"):   self.r("ate")
-            elif self.ends("tional"):  self.r("tion")
-        elif self.b[self.k - 1] == 'c':
-            if self.ends("enci"):      self.r("ence")
-            elif self.ends("anci"):    self.r("ance")
-        elif self.b[self.k - 1] == 'e':
-            if self.ends("izer"):      self.r("ize")
-        elif self.b[self.k - 1] == 'l':
-            if self.ends("bli"):       self.r("ble") # --DEPARTURE--
-            # To match the published algorithm, replace this phrase with
-            #   if self.ends("abli"):      self.r("able")
-            elif self.ends("alli"):    self.r("al")
-            elif self.ends("entli"):   self.r("ent")
-            elif self.ends("eli"):     self.r("e")
-            elif self.ends("ousli"):   self.r("ous")
-        elif self.b[self.k - 1] == 'o':
-            if self.ends("ization"):   self.r("ize")
-            elif self.ends("ation"):   self.r("ate")
-            elif self.ends("ator"):    self.r("ate")
-        elif self.b[self.k - 1] == 's':
-            if self.ends("alism"):     self.r("al")
-            elif self.ends("iveness"): self.r("ive")
-            elif self.ends("fulness"): self.r("ful")
-            elif self.ends("ousness"): self.r("ous")
-        elif self.b[self.k - 1] == 't':
-            if self.ends("aliti"):     self.r("al")
-            elif self.ends("iviti"):   self.r("ive")
-            elif self.ends("biliti"):  self.r("ble")
-        elif self.b[self.k - 1] == 'g': # --DEPARTURE--
-            if self.ends("logi"):      self.r("log")
-        # To match the published algorithm, delete this phrase
-
-    def step3(self):
-        """step3() dels with -ic-, -full, -ness etc. similar strategy to step2."""
-        if self.b[self.k] == 'e':
-            if self.ends("icate"):     self.r("ic")
-            elif self.ends("ative"):   self.r("")
-            elif self.ends("alize"):   self.r("al")
-        elif self.b[self.k] == 'i':
-            if self.ends("iciti"):     self.r("ic")
-        elif self.b[self.k] == 'l':
-            if self.ends("ical"):      self.r("ic")
-            elif self.ends("ful"):     self.r("")
-        elif self.b[self.k] == 's':
-            if self.ends("ness"):      self.r("")
-
-    def step4(self):
-        """step4() takes off -ant, -ence etc., in context <c>vcvc<v>."""
-        if self.b[self.k - 1] == 'a':
-            if self.ends("al"): pass
-            else: return
-        elif self.b[self.k - 1] == 'c':
-            if self.ends("ance"): pass
-            elif self.ends("ence"): pass
-            else: return
-        elif self.b[self.k - 1] == 'e':
-            if self.ends("er"): pass
-            else: return
-        elif self.b[self.k - 1] == 'i':
-            if self.ends("ic"): pass
-            else: return
-        elif self.b[self.k - 1] == 'l':
-            if self.ends("able"): pass
-            elif self.ends("ible"): pass
-            else: return
-        elif self.b[self.k - 1] == 'n':
-            if self.ends("ant"): pass
-            elif self.ends("ement"): pass
-            elif self.ends("ment"): pass
-            elif self.ends("ent"): pass
-            else: return
-        elif self.b[self.k - 1] == 'o':
-            if self.ends("ion") and (self.b[self.j] == 's' or self.b[self.j] == 't'): pass
-            elif self.ends("ou"): pass
-            # takes care of -ous
-            else: return
-        elif self.b[self.k - 1] == 's':
-            if self.ends("ism"): pass
-            else: return
-        elif self.b[self.k - 1] == 't':
-            if self.ends("ate"): pass
-            elif self.ends("iti"): pass
-            else: return
-        elif self.b[self.k - 1] == 'u':
-            if self.ends("ous"): pass
-            else: return
-        elif self.b[self.k - 1] == 'v':
-            if self.ends("ive"): pass
-            else: return
-        elif self.b[self.k - 1] == 'z':
-            if self.ends("ize"): pass
-            else: return
+#===============================================================================
+#Indexing pipeline
+#cacm.all is read once: every record is parsed and its title and abstract are
+#split into tokens (analysis.py), or the tokens are read from a token file
+#(tokenfile.py) written by an earlier build. Every distinct token is run
+#through the analyzer chain once, then the tokens are mapped to their terms in
+#memory on the way to dict2.
+
+def chain(stemming, stopwords):
+    """Return the analyzer chain of the stemming option and the stopwords."""
+    stemmer = None
+    if stemming == "y":
+        stemmer = stems
+    return analysis.chain(stemmer, stopwords)
+
+def gather(records, analyzer, docs=None, vocabulary=None):
+    """Yield [term, id, pos] for every term of every document in records,
+    (id, tokens) with the tokens of its title and abstract. pos counts every
+    term of the document, stopwords too. vocabulary maps every token to its
+    term, made with analyzer if it is not given. The ID of every document is
+    appended to the list docs if it is given."""
+    records = list(records)
+    if vocabulary is None:
+        distinct = set()
+        for id, tokens in records:
+            distinct.update(tokens)
+        vocabulary = analyzer.vocabulary(distinct)
+    for id, tokens in records:
+        if docs is not None:
+            docs.append(id)
+        for pos, term in analyzer.terms(tokens, vocabulary):
+            yield [term, id, pos]
+
+def invert(dict2):
+    """Sort dict2 alphabetically and group it into (dictionary, posting)."""
+    dict2.sort(key=lambda k: k[0].lower())
+
+    #dict2 is stable sorted by term, so for each term its entries stay in document order and
+    #the entries of one document are next to each other. A hash table from term to its link
+    #in posting replaces scanning the whole dictionary, and the doc we are adding to can only
+    #be the last doc in that term's posting, so every entry of dict2 is handled in O(1).
+    dictionary = [] #term, doc freq, link to posting
+    posting = [] #doc number, term freq, term positions      [ [doc#], [term freq], [ [pos doc1],[pos doc2] ] ]
+    links = {} #term -> link (index) to posting array
+    link = 0 #counter for index to posting array
+    for index in range(len(dict2)): #for every term in dict2
+        term = dict2[index][0]
+        id = dict2[index][1]
+        #if term is not in dictionary, add term and an empty posting
+        if term not in links:
+            links[term] = link
+            dictionary.append([term, 0, link]) #doc freq is increased below
+            posting.append([[], [], []])
+            link = link+1
+        idx = links[term]
+        post = posting[idx]
+        #if doc number is not the last doc in posting, add it
+        if (len(post[0]) == 0) or (post[0][-1] != id):
+            post[0].append(id)
+            post[1].append(1) #term freq
+            post[2].append([dict2[index][2]]) #term position
+            dictionary[idx][1] = dictionary[idx][1]+1 #increase doc freq
+        #else same doc, increase term freq and add term position
         else:
-            return
-        if self.m() > 1:
-            self.k = self.j
-
-    def step5(self):
-        """step5() removes a final -e if m() > 1, and changes -ll to -l if
-        m() > 1.
-        """
-        self.j = self.k
-        if self.b[self.k] == 'e':
-            a = self.m()
-            if a > 1 or (a == 1 and not self.cvc(self.k-1)):
-                self.k = self.k - 1
-        if self.b[self.k] == 'l' and self.doublec(self.k) and self.m() > 1:
-            self.k = self.k -1
-
-    def stem(self, p, i, j):
-        """In stem(p,i,j), p is a char pointer, and the string to be stemmed
-        is from p[i] to p[j] inclusive. Typically i is zero and j is the
-        offset to the last character of a string, (p[j+1] == '\0'). The
-        stemmer adjusts the characters p[i] ... p[j] and returns the new
-        end-point of the string, k. Stemming never increases word length, so
-        i <= k <= j. To turn the stemmer into a module, declare 'stem' as
-        extern, and delete the remainder of this file.
-        """
-        # copy the parameters into statics
-        self.b = p
-        self.k = j
-        self.k0 = i
-        if self.k <= self.k0 + 1:
-            return self.b # --DEPARTURE--
-
-        # With this line, strings of length 1 or 2 don't go through the
-        # stemming process, although no mention is made of this in the
-        # published algorithm. Remove the line to match the published
-        # algorithm.
-
-        self.step1ab()
-        self.step1c()
-        self.step2()
-        self.step3()
-        self.step4()
-        self.step5()
-        return self.b[self.k0:self.k+1]
+            post[1][-1] = post[1][-1]+1
+            post[2][-1].append(dict2[index][2])
+    return dictionary, posting
 
 #===============================================================================
-#Main function
-if __name__ == '__main__':
-    #create a edited version of cacm.all with only .I, .T and .W and save to file named edited.txt
-    print"Creating edited version of cacm.all ..."
-    out = open("edited.txt", "a")
-    infile = open("cacm.all","r")
-    line = infile.readline()
-    while 1:
-        if (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".A" in line.split())| (".K" in line.split()) | (".C" in line.split()):
-            while 1:
-                if (".I" in line.split()) | (".T" in line.split()) | (".W" in line.split()) | (line == ''):
-                    break
-                else:
-                    line = infile.readline() #skip line
-        if line == '':
-            break
-
-        if ".I" in line.split(): #if found id
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    out.write(line) #write line to file
-                    line = infile.readline() #next line
-
-        if ".T" in line.split(): #if found title
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    out.write(line) #write line to file
-                    line = infile.readline() #next line
-
-        if ".W" in line.split(): #if found abstract
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    out.write(line) #write line to file
-                    line = infile.readline() #next line
+#Parallel build
+#The collection is split into byte ranges of whole documents. Every range is
+#gathered and inverted in its own worker process, then the partial dictionaries
+#and postings are merged in document order.
+
+def shard(args):
+    """Gather and invert the documents whose ".I" line is in the byte range
+    [start, end) of the collection. Runs in a worker process, the stems it
+    made and its hits and misses are returned with the index of the range."""
+    filename, start, end, stemming, stopwords = args
+    hits, misses = stems.hits, stems.misses #a worker can gather several ranges
+    infile = open(filename,"r")
+    cacm.seek(infile, start)
+    docs = []
+    dict2 = list(gather(tokenfile.documents(cacm.records(infile, end)), chain(stemming, stopwords), docs))
     infile.close()
-    out.close()
-    print "Edited version of cacm.all completed"
-
-    #from edited.txt, remove all ,./;'\[]`<>?:"|{}~!@#$%^&*()_+ and save to file named clean.txt
-    print "Removing punctuations ..."
-    out = open("clean.txt", "a")
-    infile = open("edited.txt","r")
-    line = infile.readline()
-    while 1:
-        edited = ""
-        if (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".A" in line.split())| (".K" in line.split()) | (".C" in line.split()):
-            while 1:
-                if (".I" in line.split()) | (".T" in line.split()) | (".W" in line.split()) | (line == ''):
-                    break
-                else:
-                    line = infile.readline() #skip line
-        if line == '':
-            break
-
-        if ".I" in line.split(): #if found id
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    out.write(line) #write line to file
-                    line = infile.readline() #next line
-
-        if ".T" in line.split(): #if found title
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    edited = line.translate(None,string.punctuation) #remove punctuation from line
-                    out.write(edited) #write edited line to file
-                    line = infile.readline() #next line
-                    edited = ""
+    dictionary, posting = invert(dict2)
+    return dictionary, posting, docs, [stems.cache, stems.hits-hits, stems.misses-misses]
+
+def merge(shards):
+    """Merge the (dictionary, posting, docs) of shards into one (dictionary,
+    posting, docs), docs is the list of document IDs. shards must be in
+    document order, every shard after the documents of the one before it, so
+    posting lists are joined by appending."""
+    links = {} #term -> index in terms and post
+    terms = [] #terms in order of first appearance
+    post = []
+    docs = []
+    for dictionary, posting, ids in shards:
+        docs.extend(ids)
+        for index in range(len(dictionary)):
+            term = dictionary[index][0]
+            p = posting[dictionary[index][2]]
+            if term not in links:
+                links[term] = len(terms)
+                terms.append(term)
+                post.append([[], [], []])
+            idx = links[term]
+            post[idx][0].extend(p[0]) #doc id
+            post[idx][1].extend(p[1]) #term freq
+            post[idx][2].extend(p[2]) #term positions
+    #same order as sorting dict2 of the whole collection, sort is stable so
+    #terms that only differ in case keep the order they first appeared in
+    terms.sort(key=lambda t: t.lower())
+    dictionary = []
+    posting = []
+    for link in range(len(terms)):
+        p = post[links[terms[link]]]
+        dictionary.append([terms[link], len(p[0]), link])
+        posting.append(p)
+    return dictionary, posting, docs
+
+def build(filename, stemming, stopwords, processes=1, tokens=None):
+    """Return the (dictionary, posting, docs) of the collection in filename,
+    built by processes worker processes. docs is the list of the document IDs
+    in collection order. If tokens, a token file, is given the tokens are read
+    from it, written first if it is missing or stale, and gathered by this
+    process, there is no parsing left to split between workers."""
+    if tokens is not None:
+        chunks, records = tokenfile.load(tokens, filename)
+        analyzer = chain(stemming, stopwords)
+        vocabulary = [analyzer.term(token) for token in chunks] #index in chunks -> term
+        docs = []
+        dict2 = list(gather(records, analyzer, docs, vocabulary))
+        dictionary, posting = invert(dict2)
+        return dictionary, posting, docs
+    if processes <= 1:
+        infile = open(filename,"r")
+        docs = []
+        dict2 = list(gather(tokenfile.documents(cacm.records(infile)), chain(stemming, stopwords), docs)) #dict2 [ [term,id,pos], [...], ...]
+        infile.close()
+        dictionary, posting = invert(dict2)
+        return dictionary, posting, docs
+    size = os.path.getsize(filename)
+    ranges = []
+    for i in range(processes):
+        ranges.append((filename, size*i/processes, size*(i+1)/processes, stemming, stopwords))
+    pool = multiprocessing.Pool(processes)
+    shards = pool.map(shard, ranges)
+    pool.close()
+    pool.join()
+    for dictionary, posting, docs, (cache, hits, misses) in shards:
+        stems.cache.update(cache)
+        stems.hits = stems.hits+hits
+        stems.misses = stems.misses+misses
+    return merge([s[:3] for s in shards])
 
-        if ".W" in line.split(): #if found abstract
-            out.write(line) #write the tag
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    edited = line.translate(None,string.punctuation) #remove punctuation from line
-                    out.write(edited) #write edited line to file
-                    line = infile.readline() #next line
-                    edited = ""
+#===============================================================================
+#Add documents
+#New documents are indexed on their own and merged like one more shard into
+#the delta segment of the index (indexfile.delta()), nothing already indexed is
+#parsed again and the posting lists of index.bin are not read. When the delta
+#has more documents than a fraction of the index both are merged into a new
+#index.bin, the way a full build writes it.
+
+def decoded(index):
+    """Return the (dictionary, posting, docs) of index, an Index, with its
+    posting lists decoded and doc numbers back to document IDs."""
+    docs = index.docids()
+    posting = []
+    for link in range(len(index)):
+        post = index.posting(link)
+        posting.append([[docs[doc] for doc in post[0]], list(post[1]), post[2]])
+    return index.dictionary(), posting, docs
+
+def places(index):
+    """Return document ID -> (offset, length) of the records of index."""
+    records = {}
+    for doc in range(index.ndocs):
+        records[index.docid(doc)] = index.record(doc)
+    return records
+
+def add(dictionary, posting, docs, filename, stemming, stopwords, indexed=()):
+    """Index the documents in filename and return dictionary, posting and docs
+    with them merged in. New documents are numbered after the ones already
+    indexed, so their IDs only have to be new, not in docs nor in indexed, the
+    IDs of the documents of index.bin when docs is its delta segment."""
+    ids = set(docs)
+    ids.update(indexed)
+    infile = open(filename,"r")
+    records = list(cacm.records(infile))
     infile.close()
-    out.close()
-    print "Removed punctuations complete"
+    for id, fields in records:
+        if id in ids:
+            raise ValueError("document " + id + " is already indexed")
+        ids.add(id)
+    new = []
+    dict2 = list(gather(tokenfile.documents(records), chain(stemming, stopwords), new))
+    d, p = invert(dict2)
+    return merge([(dictionary, posting, docs), (d, p, new)])
 
-    #===========================================================================
+#===============================================================================
+#Main function
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create index.bin from a collection")
+    parser.add_argument("collection", nargs="?", default="cacm.all", help="collection in the CACM format (default cacm.all)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of worker processes, 0 for one per core (default 1)")
+    parser.add_argument("-a", "--add", metavar="FILE", help="add the documents in FILE to the delta segment of index.bin and append them to the collection")
+    parser.add_argument("-d", "--delta", type=float, default=0.1, metavar="FRACTION", help="with -a, write index.bin again with the delta merged in when the delta has more documents than FRACTION of index.bin (default 0.1, 0 to always)")
+    parser.add_argument("-z", "--compact", action="store_true", help="merge the delta segment into a new index.bin")
+    parser.add_argument("-t", "--tiers", metavar="T1,T2", help="term freq thresholds of tier 1 and tier 2 (default 20,10, or the ones of index.bin with -a)")
+    parser.add_argument("-r", "--champions", type=int, metavar="R", help="size of the champion lists (default 20, or the one of index.bin with -a)")
+    parser.add_argument("-s", "--stemming", choices=["y", "n"], help="apply stemming (asked if not given, the option of index.bin with -a)")
+    parser.add_argument("-w", "--stopwords", choices=["y", "n"], help="remove stopwords (asked if not given, the option of index.bin with -a)")
+    parser.add_argument("-c", "--stems", metavar="FILE", help="load the stems of words from FILE if it exists, and save them to it after the build")
+    parser.add_argument("-k", "--tokens", metavar="FILE", help="read the tokens of the collection from FILE, written first if it is missing or the collection changed")
+    parser.add_argument("-o", "--index", default="index.bin", metavar="FILE", help="index file to write, or to add to with -a (default index.bin)")
+    args = parser.parse_args()
+    limits = None
+    if args.tiers:
+        limits = [int(t) for t in args.tiers.split(",")]
+        if (len(limits) != 2) or (limits[1] < 1) or (limits[0] <= limits[1]):
+            parser.error("tiers must be T1,T2 with T1 > T2 >= 1")
+    r = args.champions
+    if (r is not None) and (r < 1):
+        parser.error("champion lists must have at least 1 doc")
+    processes = args.processes
+    if processes == 0:
+        processes = multiprocessing.cpu_count()
+
+    stemming = args.stemming
+    stopword = args.stopwords
+    if args.add or args.compact:
+        #stemming and stopwords options must be the ones the index was created with
+        index = indexfile.Index(args.index)
+        if stemming is None:
+            stemming = index.stemming
+        if stopword is None:
+            stopword = index.stopword
+        index.close()
     #Optional 1
-    stemming = raw_input("Apply stemming? (y/n): ");
-    if stemming == "y":
-        p = PorterStemmer()
-        out = open("output.txt","a")
-        #if len(sys.argv) > 1:
-            #for f in sys.argv[1:]:
-                #infile = open(f, 'r')
-
-        print "Stemming ..."
-        infile = open("clean.txt","r") #change to clean.txt  #testing.txt #change to cacm.all file ++++++++++++++++++++++++++++++++++++++++
-        line = infile.readline() #new
-        while 1:
-            output = ''
-            word = ''
-            #if (".I" not in line) & (".B" not in line) & (".N" not in line) & (".X" not in line) & (".T" not in line) & (".A" not in line) & (".W" not in line):
-                #line = infile.readline()
-
-            if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".A" in line.split()) | (".K" in line.split()) | (".C" in line.split()):
-                while 1:
-                    output = ''
-                    if (".T" in line.split()) | (".W" in line.split()) | (line == ''):
-                        break
-                    else:
-                        out.write(line)
-                        line = infile.readline()
-
-            if line == '':
-                print "Stemming complete"
-                break
-            if ".T" in line.split(): #if found title, stem the words
-                out.write(line)
-                while 1:
-                    output = ''
-                    word = ''
-                    line = infile.readline()
-                    if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                        break
-            #indented
-                    for c in line:
-                        if c.isalpha():
-                            word += c.lower()
-                        else:
-                            if word:
-                                output += p.stem(word, 0,len(word)-1)
-                                word = ''
-                            output += c.lower()
-                    #print output,
-                    out.write(output)
-
-            if ".W" in line.split(): #if found abstract, stem the words
-                out.write(line)
-                while 1:
-                    output = ''
-                    word = ''
-                    line = infile.readline()
-                    if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split())| (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                        break
-
-                    for c in line:
-                        if c.isalpha():
-                            word += c.lower()
-                        else:
-                            if word:
-                                output += p.stem(word, 0,len(word)-1)
-                                word = ''
-                            output += c.lower()
-                    #print output, #comma after output means print on the same line
-                    out.write(output)
-
-        out.close()
-        infile.close()
-
-    """
-    #==========================================================================
-    #Option 2
-    stopword = raw_input("Remove stopwords? (y/n): ");
+    if stemming is None:
+        stemming = raw_input("Apply stemming? (y/n): ");
+    #Optional 2
+    if stopword is None:
+        stopword = raw_input("Remove stopwords? (y/n): ");
+    #any answer but y is no
+    stemming = (stemming == "y") and "y" or "n"
+    stopword = (stopword == "y") and "y" or "n"
+    stopwords = frozenset()
     if stopword == "y":
-        if stemming == "y":
-            edit = open("output.txt", "r")
-        else: #not stemed
-            edit = open("clean.txt", "r") #change to clean.txt #testing.txt #change to cacm.all file  ++++++++++++++++++++++++++++++++++++++++
-        temp = open("temp.txt", "a")
-        line = ''
-        line = edit.readline()
-        print "Removing stopwords ..."
-
-        while 1:
-            #if (".I" not in line) & (".B" not in line) & (".N" not in line) & (".X" not in line) & (".T" not in line) & (".A" not in line) & (".W" not in line):
-                    #line = edit.readline()
-
-            if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".A" in line.split())| (".K" in line.split()) | (".C" in line.split()):
-                while 1:
-                    if (".T" in line.split()) | (".W" in line.split()) | (line == ''):
-                        break
-                    else:
-                        temp.write(line)
-                        line = edit.readline()
-
-            if line == '':
-                print "Stopwords removal complete"
-                break
-
-            if ".T" in line.split(): #if found title, remove stopwords
-                temp.write(line)
-                #stwds = open("stopwords.txt","r")
-                while 1:
-                    stwds = open("common_words","r") #stopwords.txt #or common_words ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                    line = edit.readline()
-                    if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split())| (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                        #stwds.close()
-                        break
-                    while 1:
-                        sword = stwds.readline().replace('\n', '') #check word with every stopword #replace newline character with a space so that the word is followed by a space
-                        if sword == '':
-                            if "\n" not in line:
-                                line = line+"\n"
-                            temp.write(line)
-                            stwds.close()
-                            break
-                        if sword in line.split():
-                            #print sword
-                            line = line.split()
-                            #print line
-                            line = filter(lambda x: x != sword, line)
-                            #print line
-                            line = " ".join(line)
-                            #print line
-                        #line = line.replace(sword, "") #does not remove "the" if the word is "The" in collection, only work if you stem which change "The" to "the"
-
-            if ".W" in line.split(): #if found abstract, remove stopwords
-                temp.write(line)
-                #stwds = open("stopwords.txt","r")
-                while 1:
-                    stwds = open("common_words","r") #stopwords.txt #or common_words +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                    line = edit.readline()
-                    if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split())| (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                        #stwds.close()
-                        break
-                    while 1:
-                        sword = stwds.readline().replace('\n', '') #check word with every stopword
-                        if sword == '':
-                            if "\n" not in line:
-                                line = line+"\n"
-                            temp.write(line)
-                            stwds.close()
-                            break
-                        if sword in line.split():
-                            #print sword
-                            line = line.split()
-                            #print line
-                            #for w in range(len(line)):
-    	                       #if line[w] == sword:
-    		                      #line.remove(sword)
-                            #line.remove(sword)
-                            line = filter(lambda x: x != sword, line)
-                            #print line
-                            line = " ".join(line)
-                            #line = line.replace(sword, "") #remove!
-                            #print line
-        edit.close()
-        temp.close()
-    """
-
-    #========================================================================
-    #Gathering terms from title and abstract and store terms with id
-    #if yes/no stopword or stemming or both
-    #if (stemming == "y") & (stopword == "y"):
-      #  infile = open("temp.txt","r")
-    #elif (stemming == "y") & (stopword == "n"):
-     #   infile = open("output.txt","r")
-    #elif (stemming == "n") & (stopword == "y"):
-     #   infile = open("temp.txt")
-    #else: #not stemed & stopwords not removed
-     #   infile = open("clean.txt","r") #changed to clean.txt #testing.txt #change to cacm.all file ++++++++++++++++++++++++++++++++++++++
-
-    #if yes stemming
-    if stemming == "y":
-        infile = open("output.txt","r")
+        stopwords = analysis.stopwords()
+    if args.stems and (stemming == "y"):
+        stems.load(args.stems)
+
+    deltafile = args.index + ".delta"
+    full = True #write index.bin, else only the delta segment
+    if args.add or args.compact:
+        index = indexfile.Index(args.index)
+        delta = indexfile.segment(args.index)
+        if limits is None:
+            limits = index.limits
+        if r is None:
+            r = index.r
+        records = {} #document ID -> offset and length of its record
+        if delta is None:
+            dictionary, posting, docs = [], [], []
+        else:
+            records = places(delta)
+            dictionary, posting, docs = decoded(delta)
+        if args.add:
+            #Add documents to the Dictionary and Postings of the delta segment
+            print "Adding documents from", args.add, "..."
+            dictionary, posting, docs = add(dictionary, posting, docs, args.add, stemming, stopwords, index.docids())
+            #append the documents to the collection so they can be displayed, only their
+            #records are scanned for offsets, moved past the end of the collection
+            batch = open(args.add,"rb").read()
+            size = os.path.getsize(args.collection)
+            for id, (offset, length) in cacm.offsets(batch).items():
+                records[id] = (size + offset, length)
+            out = open(args.collection,"ab")
+            out.write(batch)
+            out.close()
+            print "Documents added to", args.collection
+        if delta is not None:
+            delta.close()
+        full = args.compact or (len(docs) > args.delta*index.ndocs)
+        if full:
+            #merge the delta into the existing Dictionary and Postings, index.bin is written again
+            print "Merging", len(docs), "documents of the delta segment into", args.index, "..."
+            records.update(places(index))
+            dictionary, posting, docs = merge([decoded(index), (dictionary, posting, docs)])
+            index.close()
+        else:
+            print "Delta segment documents:", len(docs)
     else:
-        infile = open("clean.txt","r")
-
-    print "Gathering terms ..."
-    #out = open("temp2.txt","a")
-    counter = 0 #word position counter
-    dict1 = []
-    dict2 = []
-    line = infile.readline()
-    while 1:
-        if (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".A" in line.split())| (".K" in line.split()) | (".C" in line.split()):
-            while 1:
-                if (".I" in line.split()) | (".T" in line.split()) | (".W" in line.split()) | (line == ''):
-                    break
-                else:
-                    line = infile.readline() #go to next line
-        if line == '':
-            break
-
-        if ".I" in line.split(): #if found id
-            counter = 0 #reset counter
-            id = 0
-            idline = line.split()
-            id = idline[1] #list starts at [0], id number is in [1]
-            line = infile.readline()
-            while 1:
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split()) | (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                else:
-                    line = infile.readline()
-
-        if ".T" in line.split(): #if found title
-            while 1:
-                line = infile.readline() #goes to the next line after ".T" tag line
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split())| (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                line = line.split()
-                for index in range(len(line)):
-                    counter = counter+1 #increase counter
-                    dict1 = []
-                    data = "".join(line[index])
-                    dict1.append(data)
-                    dict1.append(id)
-                    dict1.append(counter) #save term position
-                    dict2.append(dict1) #save dict1[term, id, pos] in dict2[] => dict2 [ [term,id,pos], [...], ...]
-                    #data = data+" "+id+"\n" #term followed by id and a newline
-                    #out.write(data)
-
-        if ".W" in line.split(): #if found abstract
-            while 1:
-                line = infile.readline() #goes to next line after ".W" tag line
-                if (".I" in line.split()) | (".B" in line.split()) | (".N" in line.split()) | (".X" in line.split()) | (".T" in line.split()) | (".A" in line.split()) | (".W" in line.split())| (".K" in line.split()) | (".C" in line.split()) | (line == ''):
-                    break
-                line = line.split()
-                for index in range(len(line)):
-                    counter = counter+1 #increase counter
-                    dict1 = []
-                    data = "".join(line[index])
-                    dict1.append(data)
-                    dict1.append(id)
-                    dict1.append(counter) #save term position
-                    dict2.append(dict1)
-                    #data = data+" "+id+"\n" #term followed by id and a newline
-                    #out.write(data)
-    #out.close()
-    infile.close()
-
-    print "Gathering terms complete"
-    #sort dict2 alphabetically
-    #print dict2
-    #dict2.sort(key=lambda x:x[0]) #captialized words will be at the front from A to Z then lower case after from A to Z
-    #dict2 = sorted(dict2, key=lambda x: (x[0].upper(), x[0].islower())) #sort with capitalized words
-    #print "\n"
-    #print dict2
-    #from operator import itemgetter
-    #dict2.sort(key=itemgetter(0))    #for large lists
-
-    print "Sorting dict2 ..."
-    dict2 = sorted(dict2, key=lambda k: (k[0].lower()))
-    #for index in range(len(dict2)):
-        #print dict2[index]
-
-    print "Sorting complete"
-
-    #===========================================================================
-    #Option 2
-    #remove stopwords
-    #read stopword file
-    stopword = raw_input("Remove stopwords? (y/n): ");
-    if stopword == "y":
-        print "Removing stopwords ..."
-        #for each word in stopword file, go through dict2
-        stwds = open("common_words","r") #stopwords.txt #or common_words ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-        #dict3 =[]
-        while 1: #for every stopword, go through dict2
-            line = stwds.readline().replace('\n', '') #remove the "\n" newline at the end when reading
-            if line == "":
-                break
-            #for index in range(len(dict2)): #for every word in dict2, find the stopword
-             #   if line not in dict2[index]: #if term is not a stopword, add to dict3
-              #      dict3.append(dict2[index])
-            #dict2 = []
-           # dict2 = dict3 #switch back the removed stopword list
-
-            for index in range(len(dict2)):
-                #print line, dict2[index]
-                #print line in dict2[index]
-                #print line == dict2[index][0]
-                #if line == dict2[index][0]
-                if line in dict2[index]:
-                    dict2[index] = [] #mark the stopword spot to a [] blank
-        dict2 = [item for item in dict2 if item != []] #remove all [] blanks from dict2
-        print "Remove stopwords complete"
-        #for index in range(len(dict2)):
-            #print dict2[index]
-    #stwds.close()
-
-    #===========================================================================
-     #Create Dictionary and Postings
-    print "Creating Dictionary and Posting ..."
-    dout = open("dictionary.txt", "a")
-    pout = open("posting.txt","a")
-    dict = [] #term, doc freq, link to posting
-    dictionary = [] #add dict to dictionary
-    post = [] #doc number, term freq, term positions      [ [doc#], [term freq], [ [pos doc1],[pos doc2] ] ]
-    posting = [] #add post to posting
-    link = 0 #counter for index to posting array
-    length = len(dict2)-1
-    for index in range(length): #len(dict2)): #for every term in dict2
-        #print "Progress:", index, "/", length
-        dict = []
-        post = []
-        #if dictionary is empty, add a term in
-        if len(dictionary) == 0:
-            #print "EMPTY"
-            #print dict2[index][0]
-            dict.append(dict2[index][0]) #term
-            dict.append(1) #found it in 1 doc in the beginning, will increase later below if more found
-            dict.append(link) #index(link) to posting array
-            link = link+1 #counter for index to posting array
-            dictionary.append(dict) #add to dictionary
-            #print dictionary
-            #print len(dictionary)
-            post.append([dict2[index][1]]) #doc id
-            post.append([1]) #term freq in doc in the beginning, will increase later below if more found
-            post.append([[dict2[index][2]]]) #post.append([[-1]]) #unknown position yet, place holder +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-            posting.append(post)
-            #print posting
+        #Gathering terms from title and abstract and Create Dictionary and Postings
+        if args.tokens:
+            print "Creating Dictionary and Posting from the tokens of", args.collection, "in", args.tokens, "..."
         else:
-        ##if term is not in dictionary, add term and add posting
-            #if term is in dictionary
-            inside = 0
-            for d in range(len(dictionary)):
-                if dict2[index][0] == dictionary[d][0]: #comput == computer = False!
-                #if dict2[index][0] in dictionary[d][0]: #"comput in computer = True!
-                    inside = 1
-                    dict = []
-                    post = []
-                    #for x in range(len(dictionary)):
-                        #if dict2[x][0] == dictionary[x][0]: #term == term
-                            #idx = dictionary[x][2] #link to posting
-                    idx = dictionary[d][2]
-                    #if doc number is not in doc ID, add it
-                    if dict2[index][1] not in posting[idx][0]:
-                        posting[idx][0].append(dict2[index][1])
-                        #add term freq, position
-                        posting[idx][1].append(1)
-                        posting[idx][2].append([dict2[index][2]]) #posting[idx][2].append([-1]) #default position +++++++++++++++++++++++++++++++++
-                        #increase doc freq for dictionary
-                        #dictionary[x][1] = dictionary[x][1]+1
-                        dictionary[d][1] = dictionary[d][1]+1
-                    #else find doc number in doc id, increase to term freq
-                    else:
-                        for i in range(len(posting[idx][0])):
-                            if dict2[index][1] == posting[idx][0][i]:
-                                posting[idx][1][i] = posting[idx][1][i]+1 #increase term freq
-                                posting[idx][2][i].append(dict2[index][2]) #add term position ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-
-
-##                if dict2[index][0] not in dictionary[d][0]: #dict2[Term][ID]  dictionary[[Term,..,..],[...],...]
-##                    dict.append(dict2[index][0]) #term
-##                    dict.append(1) #found it in 1 doc in the beginning, will increase later below if more found
-##                    dict.append(link) #index(link) to posting array
-##                    link = link+1 #counter for index to posting array
-##                    dictionary.append(dict) #add to dictionary
-##                    print dictionary
-##                    post.append([dict2[index][1]]) #doc id
-##                    post.append([1]) #term freq in doc in the beginning, will increase later below if more found
-##                    post.append([[-1]]) #unknown position yet, place holder +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-##                    posting.append(post)
-##                    dict = []
-##                    post = []
-
-
-            #if term is not in dictionary, add term and add posting
-            if inside == 0:
-                dict = []
-                post = []
-                dict.append(dict2[index][0]) #term
-                dict.append(1) #doc freq, found it in 1 doc in the beginning, will increase later below if more found
-                dict.append(link) #index(link) to posting array
-                link = link+1 #counter for index to posting array
-                dictionary.append(dict) #add to dictionary
-                #print dictionary
-                post.append([dict2[index][1]]) #doc id
-                post.append([1]) #term freq in doc in the beginning, will increase later below if more found
-                post.append([[dict2[index][2]]]) #post.append([[-1]]) #unknown position yet, place holder +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-                posting.append(post)
-
-
-##                else: #if term is in dictionary
-##                    dict = []
-##                    post = []
-##                    #for x in range(len(dictionary)):
-##                        #if dict2[x][0] == dictionary[x][0]: #term == term
-##                            #idx = dictionary[x][2] #link to posting
-##                            idx = dictionary[d][2]
-##                            #if doc number is not in doc ID, add it
-##                            if dict2[index][1] not in posting[idx][0]:
-##                                posting[idx][0].append(dict2[index][1])
-##                                #add term freq, position
-##                                posting[idx][1].append(1)
-##                                #increase doc freq for dictionary
-##                                #dictionary[x][1] = dictionary[x][1]+1
-##                                dictionary[d][1] = dictionary[d][1]+1
-##                            #else find doc number in doc id, increase to term freq
-##                            else:
-##                                for i in range(len(posting[idx][0])):
-##                                    if dict2[index][1] == posting[idx][0][i]:
-##                                        posting[idx][1][i] = posting[idx][1][i]+1
-
-
-    #print "\n"
-    #print dictionary
-    #print "\n"
-    #print posting
-    #for p in range(len(dictionary)):
-        #print "Dictionary:",dictionary[p]," Posting:", posting[p]
-    print "Dictionary and Posting created"
+            print "Creating Dictionary and Posting from", args.collection, "with", processes, "process(es) ..."
+        dictionary, posting, docs = build(args.collection, stemming, stopwords, processes, args.tokens)
+        print "Dictionary and Posting created"
+        #offset and length of the record of every document, search.py seeks to them to display the results
+        infile = open(args.collection,"rb")
+        records = cacm.offsets(infile.read())
+        infile.close()
     print "Total Terms:", len(dictionary)
-
-    #write dictionary to file
-    print "Writing to file ..."
-    cPickle.dump(dictionary, open("dictionary.txt", "wb"))
-    #write posting to file
-    cPickle.dump(posting, open("posting.txt", "wb"))
-
-    dout.close()
-    pout.close()
+    if stemming == "y":
+        print "Stems cached:", len(stems), "hits:", stems.hits, "misses:", stems.misses
+        if args.stems:
+            stems.save(args.stems)
+    if limits is None:
+        limits = indexfile.TIERS
+    if r is None:
+        r = indexfile.CHAMPIONS
+
+    #write dictionary and compressed posting to index file
+    if full:
+        print "Writing to file ..."
+        indexfile.write(args.index, indexfile.sections(dictionary, posting, docs, limits, r, stemming + stopword, records, collection=args.collection))
+        if os.path.exists(deltafile): #its documents are in index.bin now, or were indexed again
+            os.remove(deltafile)
+    else:
+        print "Writing to", deltafile, "..."
+        indexfile.write(deltafile, indexfile.delta(dictionary, posting, docs, index, stemming + stopword, records, args.collection), indexfile.DELTA)
+        index.close()
     print "Writing complete"
-
-
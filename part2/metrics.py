@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Evaluation measures of rankings against the relevance judgements.
+
+A ranking is the list of the document IDs retrieved for a query, best first,
+relevant the list of the document IDs judged relevant to the query (qrels()).
+With binary relevance:
+
+    precisions   precision at every relevant document of the ranking
+    MAP          sum of the precisions / |R|
+    R-Precision  relevant documents in the first |R| / |R|
+    P@k          relevant documents in the first k / k
+    Recall@k     relevant documents in the first k / |R|
+    nDCG@k       sum of 1 / log2 (rank + 1) of the relevant documents in the
+                 first k / the same sum for a ranking with all of them first
+
+Every value is rounded to 2 decimals like eval.py prints them, and so are the
+precisions before they are added up.
+"""
+import math
+
+MEASURES = ["MAP", "R-Precision", "P", "Recall", "nDCG"] #table() order, P, Recall and nDCG at k
+
+def qrels(filename="qrels.text"):
+    """Return the relevance judgements of filename, query number -> list of
+    the relevant document IDs, in file order and without leading zeros."""
+    relevant = {}
+    infile = open(filename, "r")
+    for line in infile:
+        fields = line.split()
+        if fields:
+            relevant.setdefault(int(fields[0]), []).append(fields[1].lstrip("0"))
+    infile.close()
+    return relevant
+
+def precisions(ranking, relevant):
+    """Return the precision at every relevant document of the ranking."""
+    result = []
+    rels = 0 #relevant documents so far
+    for index in range(len(ranking)):
+        if ranking[index] in relevant:
+            rels = rels + 1
+            result.append(round(rels/(index+1.0), 2))
+    return result
+
+def averageprecision(ranking, relevant):
+    """Return the average precision of the ranking, the MAP of one query."""
+    if len(relevant) == 0:
+        return 0
+    return round(sum(precisions(ranking, relevant))/len(relevant), 2)
+
+def hits(ranking, relevant, k):
+    """Return the number of relevant documents in the first k of the ranking."""
+    return len([doc for doc in ranking[:k] if doc in relevant])
+
+def rprecision(ranking, relevant):
+    """Return the precision at |R| of the ranking."""
+    if len(relevant) == 0:
+        return 0
+    return round(hits(ranking, relevant, len(relevant))/(len(relevant)+0.0), 2)
+
+def precision(ranking, relevant, k):
+    """Return the precision at k of the ranking."""
+    return round(hits(ranking, relevant, k)/(k+0.0), 2)
+
+def recall(ranking, relevant, k):
+    """Return the recall at k of the ranking."""
+    if len(relevant) == 0:
+        return 0
+    return round(hits(ranking, relevant, k)/(len(relevant)+0.0), 2)
+
+def ndcg(ranking, relevant, k):
+    """Return the normalized discounted cumulative gain at k of the ranking."""
+    ideal = 0
+    for index in range(min(k, len(relevant))):
+        ideal = ideal + 1/math.log(index+2, 2)
+    if ideal == 0:
+        return 0
+    dcg = 0
+    for index in range(min(k, len(ranking))):
+        if ranking[index] in relevant:
+            dcg = dcg + 1/math.log(index+2, 2)
+    return round(dcg/ideal, 2)
+
+def table(rankings, relevants, k=10):
+    """Return measure name -> [ value of every query ] for the rankings of all
+    the queries, relevants[i] the relevant documents of rankings[i]."""
+    values = {}
+    for name in MEASURES:
+        values[name] = []
+    for ranking, relevant in zip(rankings, relevants):
+        relevant = set(relevant)
+        values["MAP"].append(averageprecision(ranking, relevant))
+        values["R-Precision"].append(rprecision(ranking, relevant))
+        values["P"].append(precision(ranking, relevant, k))
+        values["Recall"].append(recall(ranking, relevant, k))
+        values["nDCG"].append(ndcg(ranking, relevant, k))
+    return values
+
+def mean(values):
+    """Return the average of the values, rounded to 2 decimals."""
+    if len(values) == 0:
+        return 0
+    return round(sum(values)/(len(values)+0.0), 2)
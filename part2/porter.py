@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+"""Porter Stemming Algorithm
+This is the Porter stemming algorithm, ported to Python from the
+version coded up in ANSI C by the author. It may be be regarded
+as canonical, in that it follows the algorithm presented in
+
+Porter, 1980, An algorithm for suffix stripping, Program, Vol. 14,
+no. 3, pp 130-137,
+
+only differing from it at the points maked --DEPARTURE-- below.
+
+See also http://www.tartarus.org/~martin/PorterStemmer
+
+The algorithm as described in the paper could be exactly replicated
+by adjusting the points of DEPARTURE, but this is barely necessary,
+because (a) the points of DEPARTURE are definitely improvements, and
+(b) no encoding of the Porter stemmer I have seen is anything like
+as exact as this version, even with the points of DEPARTURE!
+
+Vivake Gupta (v@nano.com)
+
+Release 1: January 2001
+
+Further adjustments by Santiago Bruno (bananabruno@gmail.com)
+to allow word input not restricted to one word per line, leading
+to:
+
+release 2: July 2008
+
+This is the one PorterStemmer of invert.py, search.py, eval.py and test.py,
+with the same stems as release 2. The word is kept in a bytearray that the
+steps change in place. Which chars are consonants is worked out once per word
+into a mask, so cons(), m() and vowelinstem() read the mask instead of going
+back over the word.
+
+python porter.py [file] stems every word of cacm.all, or of file, and prints
+how many words it stems per second.
+The stems are not cached (analysis.Stemmer), every word is stemmed.
+"""
+import time
+import argparse
+
+#the mask of a word has "0" for a vowel and "1" for a consonant. a, e, i, o, u
+#are vowels, y is a consonant at the start of the word or after a vowel, every
+#other char is a consonant
+MASK = "".join([((chr(c) in "aeiou") and "0") or ((chr(c) == "y") and "y") or "1" for c in range(256)])
+VOWEL = ord("0")
+Y = ord("y")
+CHAR = [chr(c) for c in range(256)] #char of a byte of the buffer, faster than chr()
+
+class PorterStemmer(object):
+
+    __slots__ = ["b", "mask", "k", "k0", "j"]
+
+    def __init__(self):
+        """The main part of the stemming algorithm starts here.
+        b is a buffer holding a word to be stemmed. The letters are in b[k0],
+        b[k0+1] ... ending at b[k]. In fact k0 = 0 in this demo program. k is
+        readjusted downwards as the stemming progresses. Zero termination is
+        not in fact used in the algorithm.
+
+        Note that only lower case sequences are stemmed. Forcing to lower case
+        should be done before stem(...) is called.
+        """
+
+        self.b = bytearray()  # buffer for word to be stemmed
+        self.mask = bytearray()  # "1" where b is a consonant, "0" where it is a vowel
+        self.k = 0
+        self.k0 = 0
+        self.j = 0   # j is a general offset into the string
+
+    def consonants(self, start, end):
+        """consonants(start, end) sets mask[start] ... mask[end-1] from the
+        chars of b there and before them."""
+        b = self.b
+        mask = self.mask
+        mask[start:end] = str(b[start:end]).translate(MASK)
+        if b.find("y", start, end) != -1:
+            for i in range(max(start, self.k0), end):
+                if b[i] == Y:
+                    if (i == self.k0) or (mask[i-1] == VOWEL):
+                        mask[i] = "1"
+                    else:
+                        mask[i] = "0"
+
+    def cons(self, i):
+        """cons(i) is TRUE <=> b[i] is a consonant."""
+        return self.mask[i] != VOWEL
+
+    def m(self):
+        """m() measures the number of consonant sequences between k0 and j.
+        if c is a consonant sequence and v a vowel sequence, and <..>
+        indicates arbitrary presence,
+
+           <c><v>       gives 0
+           <c>vc<v>     gives 1
+           <c>vcvc<v>   gives 2
+           <c>vcvcvc<v> gives 3
+           ....
+        """
+        if self.j < self.k0:
+            return 0
+        return self.mask.count("01", self.k0, self.j + 1)
+
+    def vowelinstem(self):
+        """vowelinstem() is TRUE <=> k0,...j contains a vowel"""
+        return self.mask.find("0", self.k0, self.j + 1) != -1
+
+    def doublec(self, j):
+        """doublec(j) is TRUE <=> j,(j-1) contain a double consonant."""
+        if j < (self.k0 + 1):
+            return 0
+        if (self.b[j] != self.b[j-1]):
+            return 0
+        return self.cons(j)
+
+    def cvc(self, i):
+        """cvc(i) is TRUE <=> i-2,i-1,i has the form consonant - vowel - consonant
+        and also if the second c is not w,x or y. this is used when trying to
+        restore an e at the end of a short  e.g.
+
+           cav(e), lov(e), hop(e), crim(e), but
+           snow, box, tray.
+        """
+        if i < (self.k0 + 2) or not self.cons(i) or self.cons(i-1) or not self.cons(i-2):
+            return 0
+        ch = CHAR[self.b[i]]
+        if ch == 'w' or ch == 'x' or ch == 'y':
+            return 0
+        return 1
+
+    def ends(self, s):
+        """ends(s) is TRUE <=> k0,...k ends with the string s."""
+        if not self.b.endswith(s, self.k0, self.k + 1):
+            return 0
+        self.j = self.k - len(s)
+        return 1
+
+    def setto(self, s):
+        """setto(s) sets (j+1),...k to the characters in the string s, readjusting k."""
+        length = len(s)
+        self.b[self.j+1:self.j+length+1] = s
+        self.k = self.j + length
+        self.consonants(self.j+1, self.k+1)
+
+    def r(self, s):
+        """r(s) is used further down."""
+        if self.m() > 0:
+            self.setto(s)
+
+    def step1ab(self):
+        """step1ab() gets rid of plurals and -ed or -ing. e.g.
+
+           caresses  ->  caress
+           ponies    ->  poni
+           ties      ->  ti
+           caress    ->  caress
+           cats      ->  cat
+
+           feed      ->  feed
+           agreed    ->  agree
+           disabled  ->  disable
+
+           matting   ->  mat
+           mating    ->  mate
+           meeting   ->  meet
+           milling   ->  mill
+           messing   ->  mess
+
+           meetings  ->  meet
+        """
+        if CHAR[self.b[self.k]] == 's':
+            if self.ends("sses"):
+                self.k = self.k - 2
+            elif self.ends("ies"):
+                self.setto("i")
+            elif CHAR[self.b[self.k - 1]] != 's':
+                self.k = self.k - 1
+        ch = CHAR[self.b[self.k]] # most words end in neither -ed nor -ing
+        if ch == 'd' and self.ends("eed"):
+            if self.m() > 0:
+                self.k = self.k - 1
+        elif ((ch == 'd' and self.ends("ed")) or (ch == 'g' and self.ends("ing"))) and self.vowelinstem():
+            self.k = self.j
+            if self.ends("at"):   self.setto("ate")
+            elif self.ends("bl"): self.setto("ble")
+            elif self.ends("iz"): self.setto("ize")
+            elif self.doublec(self.k):
+                self.k = self.k - 1
+                ch = CHAR[self.b[self.k]]
+                if ch == 'l' or ch == 's' or ch == 'z':
+                    self.k = self.k + 1
+            elif (self.m() == 1 and self.cvc(self.k)):
+                self.setto("e")
+
+    def step1c(self):
+        """step1c() turns terminal y to i when there is another vowel in the stem."""
+        if (CHAR[self.b[self.k]] == 'y' and self.ends("y") and self.vowelinstem()):
+            self.b[self.k] = 'i'
+            self.mask[self.k] = "0"
+
+    def step2(self):
+        """step2() maps double suffices to single ones.
+        so -ization ( = -ize plus -ation) maps to -ize etc. note that the
+        string before the suffix must give m() > 0.
+        """
+        ch = CHAR[self.b[self.k - 1]]
+        if ch == 'a':
+            if self.ends("ational"):   self.r("ate")
+            elif self.ends("tional"):  self.r("tion")
+        elif ch == 'c':
+            if self.ends("enci"):      self.r("ence")
+            elif self.ends("anci"):    self.r("ance")
+        elif ch == 'e':
+            if self.ends("izer"):      self.r("ize")
+        elif ch == 'l':
+            if self.ends("bli"):       self.r("ble") # --DEPARTURE--
+            # To match the published algorithm, replace this phrase with
+            #   if self.ends("abli"):      self.r("able")
+            elif self.ends("alli"):    self.r("al")
+            elif self.ends("entli"):   self.r("ent")
+            elif self.ends("eli"):     self.r("e")
+            elif self.ends("ousli"):   self.r("ous")
+        elif ch == 'o':
+            if self.ends("ization"):   self.r("ize")
+            elif self.ends("ation"):   self.r("ate")
+            elif self.ends("ator"):    self.r("ate")
+        elif ch == 's':
+            if self.ends("alism"):     self.r("al")
+            elif self.ends("iveness"): self.r("ive")
+            elif self.ends("fulness"): self.r("ful")
+            elif self.ends("ousness"): self.r("ous")
+        elif ch == 't':
+            if self.ends("aliti"):     self.r("al")
+            elif self.ends("iviti"):   self.r("ive")
+            elif self.ends("biliti"):  self.r("ble")
+        elif ch == 'g': # --DEPARTURE--
+            if self.ends("logi"):      self.r("log")
+        # To match the published algorithm, delete this phrase
+
+    def step3(self):
+        """step3() dels with -ic-, -full, -ness etc. similar strategy to step2."""
+        ch = CHAR[self.b[self.k]]
+        if ch == 'e':
+            if self.ends("icate"):     self.r("ic")
+            elif self.ends("ative"):   self.r("")
+            elif self.ends("alize"):   self.r("al")
+        elif ch == 'i':
+            if self.ends("iciti"):     self.r("ic")
+        elif ch == 'l':
+            if self.ends("ical"):      self.r("ic")
+            elif self.ends("ful"):     self.r("")
+        elif ch == 's':
+            if self.ends("ness"):      self.r("")
+
+    def step4(self):
+        """step4() takes off -ant, -ence etc., in context <c>vcvc<v>."""
+        ch = CHAR[self.b[self.k - 1]]
+        if ch == 'a':
+            if self.ends("al"): pass
+            else: return
+        elif ch == 'c':
+            if self.ends("ance"): pass
+            elif self.ends("ence"): pass
+            else: return
+        elif ch == 'e':
+            if self.ends("er"): pass
+            else: return
+        elif ch == 'i':
+            if self.ends("ic"): pass
+            else: return
+        elif ch == 'l':
+            if self.ends("able"): pass
+            elif self.ends("ible"): pass
+            else: return
+        elif ch == 'n':
+            if self.ends("ant"): pass
+            elif self.ends("ement"): pass
+            elif self.ends("ment"): pass
+            elif self.ends("ent"): pass
+            else: return
+        elif ch == 'o':
+            if self.ends("ion") and (CHAR[self.b[self.j]] == 's' or CHAR[self.b[self.j]] == 't'): pass
+            elif self.ends("ou"): pass
+            # takes care of -ous
+            else: return
+        elif ch == 's':
+            if self.ends("ism"): pass
+            else: return
+        elif ch == 't':
+            if self.ends("ate"): pass
+            elif self.ends("iti"): pass
+            else: return
+        elif ch == 'u':
+            if self.ends("ous"): pass
+            else: return
+        elif ch == 'v':
+            if self.ends("ive"): pass
+            else: return
+        elif ch == 'z':
+            if self.ends("ize"): pass
+            else: return
+        else:
+            return
+        if self.m() > 1:
+            self.k = self.j
+
+    def step5(self):
+        """step5() removes a final -e if m() > 1, and changes -ll to -l if
+        m() > 1.
+        """
+        self.j = self.k
+        if CHAR[self.b[self.k]] == 'e':
+            a = self.m()
+            if a > 1 or (a == 1 and not self.cvc(self.k-1)):
+                self.k = self.k - 1
+        if CHAR[self.b[self.k]] == 'l' and self.doublec(self.k) and self.m() > 1:
+            self.k = self.k -1
+
+    def stem(self, p, i, j):
+        """In stem(p,i,j), p is a char pointer, and the string to be stemmed
+        is from p[i] to p[j] inclusive. Typically i is zero and j is the
+        offset to the last character of a string, (p[j+1] == '\0'). The
+        stemmer adjusts the characters p[i] ... p[j] and returns the new
+        end-point of the string, k. Stemming never increases word length, so
+        i <= k <= j. To turn the stemmer into a module, declare 'stem' as
+        extern, and delete the remainder of this file.
+        """
+        # copy the parameters into statics
+        if j <= i + 1:
+            return p # --DEPARTURE--
+
+        # With this line, strings of length 1 or 2 don't go through the
+        # stemming process, although no mention is made of this in the
+        # published algorithm. Remove the line to match the published
+        # algorithm.
+
+        self.b = bytearray(p)
+        self.mask = bytearray(p.translate(MASK))
+        self.k = j
+        self.k0 = i
+        if "y" in p:
+            self.consonants(i, len(p))
+
+        self.step1ab()
+        self.step1c()
+        self.step2()
+        self.step3()
+        self.step4()
+        self.step5()
+        return str(self.b[self.k0:self.k+1])
+
+#===============================================================================
+#Main function
+if __name__ == '__main__':
+    import analysis #only for its word pattern, importers of PorterStemmer do not need it
+    parser = argparse.ArgumentParser(description="Measure how many words per second PorterStemmer stems")
+    parser.add_argument("file", nargs="?", default="cacm.all", help="text file to take the words from (default cacm.all)")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="number of times the words are stemmed, the fastest is printed (default 3)")
+    args = parser.parse_args()
+    words = [w.lower() for w in analysis.word.findall(open(args.file,"r").read())]
+    p = PorterStemmer()
+    elapsed = None
+    for run in range(max(args.runs, 1)):
+        start = time.time()
+        for w in words:
+            p.stem(w, 0, len(w)-1)
+        t = time.time() - start
+        if (elapsed is None) or (t < elapsed):
+            elapsed = t
+    print "Words:", len(words), "distinct:", len(set(words))
+    print "Time:", round(elapsed, 2), "seconds,", int(len(words) / elapsed), "words per second"
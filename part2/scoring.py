@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+"""Scoring models: cosine, BM25 and query likelihood, term at a time.
+
+The similarity score of a document d and a query q is
+
+    score(d,q) = d . q / ( |d| . |q| )
+
+with tf = log (term freq) + 1, idf = log (N / df), N the number of terms in
+the dictionary, and every weight tf*idf rounded to 2 decimals. Only the query
+terms have a weight in q, so d . q only needs the rows of the query terms in
+the term-document matrix of the weights: each one is read once and its weight
+in every document is added to that document's accumulator. The matrix and |d|
+were computed by invert.py (indexfile.matrix, indexfile.norms). product()
+scores a whole list of queries with one pass over the rows they need.
+
+maxscore() ranks every document that has a query term, document at a time. It
+uses the highest score each term can add to a document (indexfile.maxweights)
+to skip documents that cannot get into the top k.
+
+Cosine, BM25 and QueryLikelihood score a query with a model, MODELS maps their
+names to them. search.py and eval.py only use the scorer interface:
+
+    scorer = MODELS[name](index, posting, queryterms)
+    scorer.terms        [ [link, count], ... ] the query terms in the dictionary
+    scorer.score(doc)   score of the doc number, rounded to 2 decimals
+    scorer.rank(k)      [ [doc, score], ... ] the k documents with the highest
+                        scores of all the documents that have a query term
+
+BM25 and QueryLikelihood use the document lengths and collection statistics
+invert.py stored in index.bin, so they also read every posting list only once.
+"""
+import math
+import heapq
+import bisect
+
+def counts(index, queryterms):
+    """Return [ [link, count], ... ] the terms of the list of query terms found
+    in the dictionary of index, in dictionary order, and how many times they
+    are in the list."""
+    links = [] #links of the query terms found in the dictionary
+    for term in queryterms:
+        link = index.find(term)
+        if (link != -1) & (link not in links):
+            links.append(link)
+    links.sort() #dictionary order
+    return [[link, queryterms.count(index.term(link))] for link in links]
+
+def query(index, queryterms):
+    """Return the query vector [ [link, weight], ... ] of the list of query
+    terms, the terms found in the dictionary of index, in dictionary order."""
+    N = len(index)+0.0
+    qvector = []
+    for link, count in counts(index, queryterms):
+        idf = round(math.log10(N/index.df(link)),2) #idf = log (N / df)
+        tf = round(math.log10(count) + 1, 2) #tf = log (term freq) + 1
+        qvector.append([link, round(tf*idf,2)])
+    return qvector
+
+def length(qvector):
+    """Return the length |q| of the query vector."""
+    square = 0
+    for link, weight in qvector:
+        square = square + weight*weight
+    return round(math.sqrt(square),2)
+
+def product(index, qvectors):
+    """Return the accumulators, doc# -> d . q, of every query vector of the
+    list, the product of the query vectors and the term-document matrix of
+    index: the row of every term is read once, for all the query vectors that
+    have it."""
+    queries = {} #link -> [ [query#, query weight], ... ]
+    for q in range(len(qvectors)):
+        for link, qweight in qvectors[q]:
+            queries.setdefault(link, []).append([q, qweight])
+    accs = [{} for qvector in qvectors]
+    for link in sorted(queries): #dictionary order, every query adds up its terms in the same order
+        docs, weights = index.row(link)
+        for q, qweight in queries[link]:
+            acc = accs[q]
+            for a in range(len(docs)):
+                acc[docs[a]] = acc.get(docs[a], 0) + qweight*weights[a]
+    return accs
+
+def cosine(index, acc, nqvector, doc):
+    """Return the similarity score of the doc number, rounded to 2 decimals."""
+    return round(acc.get(doc, 0)/(index.norm(doc)*nqvector),2)
+
+def top(candidates, scores, k):
+    """Return [ [doc, score], ... ] the k candidates with the highest scores,
+    highest first, scores[i] is the score of candidates[i]. Equal scores keep
+    the order of the candidates. Only a heap of k candidates is kept, so it
+    takes O(n log k) for n candidates."""
+    if k <= 0:
+        return []
+    best = heapq.nlargest(k, range(len(scores)), key=lambda i: (scores[i], -i))
+    return [[candidates[i], scores[i]] for i in best]
+
+def tier(index, links, level):
+    """Return the docs in tier level (1 or 2) of the terms with the links, the
+    docs of every term one after the other, each doc once."""
+    docs = []
+    seen = set()
+    for link in links:
+        for doc in index.tier(link, level):
+            if doc not in seen:
+                seen.add(doc)
+                docs.append(doc)
+    return docs
+
+def champions(index, posting, links, r, full=False):
+    """Return tier 3 of the terms with the links: for every term, the r docs
+    below tier 2 with the highest tf*idf that are not in tier 3 yet, equal
+    weights in doc number order.
+
+    They are taken from the champion list of the term in index.bin, which
+    holds its best index.r docs, so no posting list is read. A term whose
+    champion list has less than r docs that are not in tier 3 yet adds only
+    those, unless full is True: then its r best docs are found in its posting
+    list instead."""
+    N = len(index)+0.0
+    docs = []
+    seen = set()
+    for link in links:
+        stored = index.champions(link)
+        best = []
+        for doc in stored:
+            if len(best) == r:
+                break
+            if doc not in seen:
+                best.append(doc)
+        if full & (len(best) < r) & (len(stored) == index.r): #the champion list may be too short
+            idf = round(math.log10(N/index.df(link)),2)
+            post = posting[link]
+            candidates = []
+            weights = []
+            for a in range(len(post[0])):
+                if (post[1][a] < index.limits[1]) and (post[0][a] not in seen):
+                    candidates.append(post[0][a])
+                    weights.append(weight(post[1][a], idf))
+            best = [doc for doc, w in top(candidates, weights, r)]
+        for doc in best:
+            seen.add(doc)
+            docs.append(doc)
+    return docs
+
+def weight(tf, idf):
+    """Return the weight tf*idf of a term in a document, tf the term freq."""
+    return round((round(math.log10(tf),2) + 1)*idf,2)
+
+def maxscore(index, posting, qvector, nqvector, k):
+    """Return [ [doc, score], ... ] the k documents with the highest scores of
+    all the documents that have a query term, highest first, equal scores in
+    doc number order. The result is the same as scoring every document with
+    product() and cosine() and picking them with top(), but documents whose
+    score cannot get into the top k are skipped (MaxScore)."""
+    if k <= 0:
+        return []
+    N = len(index)+0.0
+    terms = [] #[ link, query weight, idf, posting, highest score ] of the query terms, dictionary order
+    for link, qweight in qvector:
+        terms.append([link, qweight, round(math.log10(N/index.df(link)),2), posting[link],
+                      qweight*index.maxweight(link)/nqvector])
+    bybound = sorted(range(len(terms)), key=lambda t: terms[t][4]) #lowest highest score first
+    bounds = [] #bounds[i] highest score of a document only in the terms bybound[0..i]
+    for t in bybound:
+        bounds.append((bounds and bounds[-1] or 0) + terms[t][4])
+    cursors = [0]*len(terms) #next posting of every term
+    heap = [] #(score, -doc) of the top k so far, lowest first
+    threshold = -1 #a document needs a score above it to get into the top k
+    essential = 0 #documents only in the terms bybound[0..essential-1] cannot get into the top k
+    while 1:
+        #next document of the essential terms
+        doc = -1
+        for t in bybound[essential:]:
+            post = terms[t][3]
+            if (cursors[t] < len(post[0])) and ((doc == -1) or (post[0][cursors[t]] < doc)):
+                doc = post[0][cursors[t]]
+        if doc == -1:
+            break
+        norm = index.norm(doc)
+        weights = [0]*len(terms) #weight of every term in doc, 0 if not looked up or not there
+        upper = 0 #highest score doc can have
+        for t in bybound[essential:]:
+            post = terms[t][3]
+            if (cursors[t] < len(post[0])) and (post[0][cursors[t]] == doc):
+                weights[t] = weight(post[1][cursors[t]], terms[t][2])
+                cursors[t] = cursors[t]+1
+                upper = upper + terms[t][1]*weights[t]/(norm*nqvector)
+        #look doc up in the other terms while it can still get into the top k
+        skip = 0
+        for i in range(essential-1, -1, -1):
+            if upper + bounds[i] < threshold:
+                skip = 1
+                break
+            t = bybound[i]
+            post = terms[t][3]
+            cursors[t] = bisect.bisect_left(post[0], doc, cursors[t])
+            if (cursors[t] < len(post[0])) and (post[0][cursors[t]] == doc):
+                weights[t] = weight(post[1][cursors[t]], terms[t][2])
+                upper = upper + terms[t][1]*weights[t]/(norm*nqvector)
+        if skip | (upper < threshold):
+            continue
+        #d . q added up like product() does
+        dotproduct = 0
+        for t in range(len(terms)):
+            if weights[t] > 0:
+                dotproduct = dotproduct + terms[t][1]*weights[t]
+        score = round(dotproduct/(norm*nqvector),2)
+        if len(heap) < k:
+            heapq.heappush(heap, (score, -doc))
+        elif score > heap[0][0]: #later documents lose ties
+            heapq.heapreplace(heap, (score, -doc))
+        else:
+            continue
+        if len(heap) == k:
+            threshold = heap[0][0]
+            while (essential < len(terms)) and (bounds[essential] < threshold):
+                essential = essential+1
+    best = sorted(heap, reverse=True)
+    return [[-doc, score] for score, doc in best]
+
+class Scorer:
+    """Scores the documents for a list of query terms with a model. The
+    posting lists of the query terms are read the first time a document is
+    scored, every one once, and the part of the score of every document in
+    them is added to its accumulator (accumulate()), unless acc has the
+    accumulators already. rank() scores every document with an accumulator."""
+
+    def __init__(self, index, posting, queryterms, acc=None):
+        self.index = index
+        self.posting = posting
+        self.terms = counts(index, queryterms)
+        self.acc = acc
+
+    def accumulators(self):
+        """Return the accumulators, doc# -> part of the score."""
+        if self.acc is None:
+            self.acc = self.accumulate()
+        return self.acc
+
+    def rank(self, k):
+        """Return [ [doc, score], ... ] the k documents with the highest scores
+        of all the documents that have a query term, highest first, equal
+        scores in doc number order."""
+        docs = sorted(self.accumulators())
+        return top(docs, [self.score(doc) for doc in docs], k)
+
+class Cosine(Scorer):
+    """The cosine similarity of the tf-idf vectors, see the top of the file."""
+
+    def __init__(self, index, posting, queryterms, acc=None):
+        Scorer.__init__(self, index, posting, queryterms, acc)
+        self.qvector = query(index, queryterms)
+        self.nqvector = length(self.qvector)
+
+    def accumulate(self):
+        return product(self.index, [self.qvector])[0]
+
+    def score(self, doc):
+        return cosine(self.index, self.accumulators(), self.nqvector, doc)
+
+    def rank(self, k):
+        return maxscore(self.index, self.posting, self.qvector, self.nqvector, k)
+
+class BM25(Scorer):
+    """Okapi BM25:
+
+        score(d,q) = sum over the query terms t in d of
+                     count(t) * idf(t) * tf * (k1+1) / (tf + k1 * (1 - b + b * |d| / avgdl))
+
+    with idf(t) = ln (1 + (N - df + 0.5) / (df + 0.5)), N the number of
+    documents, |d| the number of terms of d and avgdl the average of |d|."""
+
+    def __init__(self, index, posting, queryterms, acc=None, k1=1.2, b=0.75):
+        Scorer.__init__(self, index, posting, queryterms, acc)
+        self.k1 = k1
+        self.b = b
+        self.avgdl = index.tokens/(index.ndocs+0.0)
+
+    def accumulate(self):
+        N = self.index.ndocs+0.0
+        acc = {}
+        for link, count in self.terms:
+            df = self.index.df(link)
+            idf = math.log(1 + (N - df + 0.5)/(df + 0.5))
+            post = self.posting[link]
+            for a in range(len(post[0])):
+                doc = post[0][a]
+                tf = post[1][a]
+                norm = self.k1*(1 - self.b + self.b*self.index.doclen(doc)/self.avgdl)
+                acc[doc] = acc.get(doc, 0) + count*idf*tf*(self.k1 + 1)/(tf + norm)
+        return acc
+
+    def score(self, doc):
+        return round(self.accumulators().get(doc, 0),2)
+
+class QueryLikelihood(Scorer):
+    """Query likelihood with Dirichlet smoothing, the log probability of the
+    query in the language model of the document:
+
+        score(d,q) = sum over the query terms t of
+                     count(t) * ln ( (tf + mu * P(t)) / (|d| + mu) )
+
+    with P(t) = cf / number of terms in the collection. It is added up as
+
+        sum over the query terms t in d of count(t) * ln (1 + tf / (mu * P(t)))
+        + sum over the query terms t of count(t) * ln (mu * P(t))
+        - |q| * ln (|d| + mu)
+
+    so only the first part needs the posting lists. Query terms not in the
+    dictionary are left out."""
+
+    def __init__(self, index, posting, queryterms, acc=None, mu=2000):
+        Scorer.__init__(self, index, posting, queryterms, acc)
+        self.mu = mu+0.0
+        self.background = {} #link -> mu * P(t)
+        self.constant = 0 #part of the score of every document
+        self.length = 0 #|q|
+        for link, count in self.terms:
+            self.background[link] = self.mu*index.cf(link)/index.tokens
+            self.constant = self.constant + count*math.log(self.background[link])
+            self.length = self.length + count
+
+    def accumulate(self):
+        acc = {}
+        for link, count in self.terms:
+            post = self.posting[link]
+            for a in range(len(post[0])):
+                doc = post[0][a]
+                acc[doc] = acc.get(doc, 0) + count*math.log(1 + post[1][a]/self.background[link])
+        return acc
+
+    def score(self, doc):
+        return round(self.accumulators().get(doc, 0) + self.constant
+                     - self.length*math.log(self.index.doclen(doc) + self.mu),2)
+
+MODELS = {"cosine": Cosine, "bm25": BM25, "ql": QueryLikelihood}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""Sweep of configurations.
+
+Every combination of the stemming and stopwords options, the tier thresholds,
+the size of the champion lists, the scoring models and the tiers or -x ranking
+ranks all the queries of query.text (eval.py) and is evaluated with qrels.text
+(metrics.py). The averages of every combination are written to a table.
+
+The index of every combination of stemming, stopwords, tiers and champion list
+size is built once, in cache/<key>/index.bin. The key is a hash of these
+options, of the collection file and of common_words, so a later sweep reuses
+the index while the collection and the stopwords do not change. An index that cannot be opened any more, made
+by an older invert.py, is built again. With one process the collection is
+only parsed for the first index, its tokens are kept in cache/tokens.bin
+(tokenfile.py) and the other indexes are built from them.
+"""
+import os
+import time
+import hashlib
+import argparse
+import multiprocessing
+import cacm
+import analysis
+import indexfile
+import invert
+import metrics
+import scoring
+import eval as evaluation
+
+COLUMNS = ["stemming", "stopwords", "tiers", "champions", "model", "ranking",
+           "MAP", "R-Precision", "P@K", "Recall@K", "nDCG@K", "time", "index"]
+
+def key(collection, stemming, stopword, limits, r):
+    """Return the cache key of the index of collection with the options."""
+    stat = os.stat(collection)
+    words = "" #md5 of the stopwords, an edited common_words makes another index
+    if stopword == "y":
+        words = hashlib.md5(open(analysis.STOPWORDS, "r").read()).hexdigest()
+    text = "%s %d %d %s %s %s %d,%d %d %s" % (os.path.abspath(collection), stat.st_size, stat.st_mtime,
+                                              stemming, stopword, words, limits[0], limits[1], r, indexfile.MAGIC)
+    return hashlib.md5(text).hexdigest()[:12]
+
+def cached(collection, stemming, stopword, limits, r, cache="cache", processes=1):
+    """Return the file name of the index of collection with the options, built
+    with invert.py if it is not in the cache yet."""
+    directory = os.path.join(cache, key(collection, stemming, stopword, limits, r))
+    filename = os.path.join(directory, "index.bin")
+    if os.path.exists(filename):
+        try:
+            indexfile.Index(filename).close()
+            return filename
+        except (ValueError, KeyError, IOError): #not an index of this version
+            pass
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    print "Building", filename, "stemming", stemming, "stopwords", stopword, "tiers", limits, "champions", r, "..."
+    stopwords = frozenset()
+    if stopword == "y":
+        stopwords = analysis.stopwords()
+    tokens = None
+    if processes <= 1:
+        tokens = os.path.join(cache, "tokens.bin")
+    dictionary, posting, docs = invert.build(collection, stemming, stopwords, processes, tokens)
+    infile = open(collection, "rb")
+    records = cacm.offsets(infile.read())
+    infile.close()
+    indexfile.write(filename, indexfile.sections(dictionary, posting, docs, limits, r, stemming + stopword, records, collection=collection))
+    return filename
+
+def run(filename, model, exhaustive, queries, relevants):
+    """Rank the queries with the index file, the model and the tiers or every
+    document (exhaustive), and return measure name -> value of every query."""
+    options = argparse.Namespace(index=filename, model=model, exhaustive=exhaustive, full=False)
+    evaluation.start(options)
+    rankings = []
+    for i in range(len(queries)):
+        output, ranking = evaluation.evaluate([queries[i][0], queries[i][1], None, relevants[i]])
+        rankings.append(ranking)
+    evaluation.indexbin.close()
+    return metrics.table(rankings, relevants, evaluation.K)
+
+def write(rows, filename):
+    """Write the rows of the table, lists of strings in COLUMNS order, to
+    filename with aligned columns, and print it."""
+    widths = [len(name) for name in COLUMNS]
+    for row in rows:
+        widths = [max(widths[i], len(row[i])) for i in range(len(COLUMNS))]
+    lines = []
+    for row in [COLUMNS] + rows:
+        lines.append("  ".join([row[i].ljust(widths[i]) for i in range(len(COLUMNS))]).rstrip())
+    out = open(filename, "w")
+    out.write("\n".join(lines) + "\n")
+    out.close()
+    print "\n".join(lines)
+
+#===============================================================================
+#Main function
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluate every combination of the options on query.text and qrels.text")
+    parser.add_argument("collection", nargs="?", default="cacm.all", help="collection in the CACM format (default cacm.all)")
+    parser.add_argument("-s", "--stemming", nargs="+", choices=["y", "n"], default=["y"], help="stemming options (default y)")
+    parser.add_argument("-w", "--stopwords", nargs="+", choices=["y", "n"], default=["y"], help="stopwords options (default y)")
+    parser.add_argument("-t", "--tiers", nargs="+", metavar="T1,T2", default=["%d,%d" % tuple(indexfile.TIERS)], help="term freq thresholds of tier 1 and tier 2 (default 20,10)")
+    parser.add_argument("-r", "--champions", nargs="+", type=int, metavar="R", default=[indexfile.CHAMPIONS], help="sizes of the champion lists (default 20)")
+    parser.add_argument("-m", "--models", nargs="+", choices=sorted(scoring.MODELS), default=sorted(scoring.MODELS), help="scoring models (default all)")
+    parser.add_argument("-x", "--exhaustive", nargs="+", choices=["n", "y"], default=["n", "y"], help="rank the tiers (n) and every document with a query term (y) (default both)")
+    parser.add_argument("-c", "--cache", default="cache", metavar="DIR", help="directory of the cached indexes (default cache)")
+    parser.add_argument("-o", "--output", default="sweep.txt", metavar="FILE", help="file of the table (default sweep.txt)")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of worker processes to build an index, 0 for one per core (default 1)")
+    args = parser.parse_args()
+    grid = []
+    for tiers in args.tiers:
+        limits = [int(t) for t in tiers.split(",")]
+        if (len(limits) != 2) or (limits[1] < 1) or (limits[0] <= limits[1]):
+            parser.error("tiers must be T1,T2 with T1 > T2 >= 1")
+        grid.append(limits)
+    for r in args.champions:
+        if r < 1:
+            parser.error("champion lists must have at least 1 doc")
+    processes = args.processes
+    if processes == 0:
+        processes = multiprocessing.cpu_count()
+
+    qrels = metrics.qrels("qrels.text")
+    rows = []
+    for stemming in args.stemming:
+        for stopword in args.stopwords:
+            #the query terms only depend on the stemming and stopwords options
+            queries = evaluation.readqueries("query.text", stemming, stopword)
+            relevants = [qrels.get(qnum, []) for qnum, queryterms in queries]
+            for limits in grid:
+                for r in args.champions:
+                    filename = cached(args.collection, stemming, stopword, limits, r, args.cache, processes)
+                    for model in args.models:
+                        for exhaustive in args.exhaustive:
+                            begin = time.time()
+                            values = run(filename, model, exhaustive == "y", queries, relevants)
+                            seconds = time.time() - begin
+                            row = [stemming, stopword, "%d,%d" % tuple(limits), str(r), model,
+                                   (exhaustive == "y") and "all" or "tiers"]
+                            row.extend([str(metrics.mean(values[name])) for name in metrics.MEASURES])
+                            row.extend(["%.2f" % seconds, os.path.basename(os.path.dirname(filename))])
+                            rows.append(row)
+                            print "%s: MAP %s R-Precision %s" % (" ".join(row[:6]), row[6], row[7])
+    print
+    write(rows, args.output)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Binary file of the raw tokens of a collection.
+
+tokens.bin holds the tokens of the title and abstract of every document of a
+collection as they are in the text, runs of chars between white space
+(analysis.chunks()), before the analyzer chain. An index is built again with
+other stemming or stopwords options, or another chain, from these tokens
+instead of reading and parsing the collection again (invert.py -k, sweep.py).
+It is written by indexfile.write() with its own magic:
+
+    header     "IRTOKEN1", number of sections
+    sections   name, byte offset and byte length of every section
+    source     size and modification time of the collection it was read
+               from, unsigned long long and double
+    docs       (number of docs + 1) unsigned ints, offset of every document ID in doctext
+    doctext    the document IDs one after the other, in collection order
+    chunks     (number of distinct tokens + 1) unsigned ints, offset of every
+               distinct token in chunktext
+    chunktext  the distinct tokens one after the other, in order of first use
+    start      (number of docs + 1) unsigned ints, index in stream of the
+               first token of every document
+    stream     the tokens of every document, index of every token in chunks,
+               unsigned ints
+
+A file whose source is not the size and modification time of the collection
+now was read from an older collection and is written again.
+"""
+import os
+from array import array
+import cacm
+import analysis
+import indexfile
+
+MAGIC = "IRTOKEN1"
+
+def documents(records):
+    """Yield (id, tokens) for the (id, fields) records of cacm.records(),
+    tokens the list of the raw tokens of the title and abstract."""
+    for id, fields in records:
+        yield id, analysis.chunks(fields.get(".T", []) + fields.get(".W", []))
+
+def strings(data, offsets, text):
+    """Return the list of the strings of a table() section pair of data."""
+    starts = array("I")
+    starts.fromstring(data[offsets[0]:offsets[0]+offsets[1]])
+    text = data[text[0]:text[0]+text[1]]
+    return [text[starts[i]:starts[i+1]] for i in range(len(starts)-1)]
+
+def write(filename, collection):
+    """Read the records of collection and write their tokens to filename."""
+    src = indexfile.source(collection) #before reading, a change while reading makes it stale
+    infile = open(collection, "r")
+    docs = []
+    links = {} #token -> index in chunks
+    chunks = []
+    start = array("I", [0])
+    stream = array("I")
+    for id, tokens in documents(cacm.records(infile)):
+        docs.append(id)
+        for token in tokens:
+            if token not in links:
+                links[token] = len(chunks)
+                chunks.append(token)
+            stream.append(links[token])
+        start.append(len(stream))
+    infile.close()
+    docoff, doctext = indexfile.table(docs)
+    chunkoff, chunktext = indexfile.table(chunks)
+    indexfile.write(filename, [["source", src],
+                               ["docs", docoff],
+                               ["doctext", doctext],
+                               ["chunks", chunkoff],
+                               ["chunktext", chunktext],
+                               ["start", start.tostring()],
+                               ["stream", stream.tostring()]], MAGIC)
+
+def read(filename, collection):
+    """Return (chunks, records) of filename, chunks the list of the distinct
+    tokens and records the list of (id, tokens) of every document, tokens an
+    array of indexes in chunks. Return None if filename does not exist or was
+    not written from collection as it is now."""
+    if not os.path.exists(filename):
+        return None
+    data = open(filename, "rb").read()
+    sections = indexfile.directory(data, MAGIC)
+    if sections is None:
+        return None
+    offset, length = sections["source"]
+    if data[offset:offset+length] != indexfile.source(collection):
+        return None
+    docs = strings(data, sections["docs"], sections["doctext"])
+    chunks = strings(data, sections["chunks"], sections["chunktext"])
+    start = array("I")
+    offset, length = sections["start"]
+    start.fromstring(data[offset:offset+length])
+    stream = array("I")
+    offset, length = sections["stream"]
+    stream.fromstring(data[offset:offset+length])
+    records = [(docs[i], stream[start[i]:start[i+1]]) for i in range(len(docs))]
+    return chunks, records
+
+def load(filename, collection):
+    """Return (chunks, records) of the tokens of collection, read from
+    filename, which is written first if it is missing or stale."""
+    tokens = read(filename, collection)
+    if tokens is None:
+        write(filename, collection)
+        tokens = read(filename, collection)
+    return tokens